@@ -11,6 +11,15 @@
  * @version 1.0.0
  */
 
+// Background tile per layout; build.py swaps in pre-sized, content-hashed variants
+const BACKGROUND_IMAGES = {
+    small: './binary-background.png',   // Mobile, shown 200px tall
+    large: './binary-background.png'    // Desktop, shown 400px tall
+};
+
+// Layout the background was last built for
+let backgroundLayout = null;
+
 /**
  * Generate binary pattern background using provided image with mobile fallback
  * Creates an animated binary background pattern that adapts to screen size and device capabilities.
@@ -25,12 +34,21 @@
  * - Reduced background size (200px vs 400px) for performance
  * - Lower opacity (0.15 vs 0.25) for better text readability
  * - Responsive scaling that adapts to orientation changes
+ * - Only rebuilt when the layout crosses the mobile breakpoint, not on every resize
+ * - Each layout downloads its own pre-sized tile once the build step has run
+ * 
+ * @param {boolean} force - Rebuild even if the layout hasn't changed
  */
-function generateBinaryBackground() {
+function generateBinaryBackground(force = false) {
     const backgroundDiv = document.getElementById('binaryBackground');
     
     if (!backgroundDiv) return; // Safety check
     
+    const layout = window.innerWidth <= 900 ? 'small' : 'large';
+    if (!force && layout === backgroundLayout) return;
+    backgroundLayout = layout;
+    const backgroundImage = BACKGROUND_IMAGES[layout];
+    
     // Completely clear any existing content and styles
     backgroundDiv.innerHTML = '';
     backgroundDiv.textContent = '';
@@ -61,13 +79,13 @@ function generateBinaryBackground() {
     const testImg = new Image();
     testImg.onload = () => {
         console.log('Background image loaded successfully');
-        backgroundDiv.style.backgroundImage = `url("./binary-background.png")`;
+        backgroundDiv.style.backgroundImage = `url("${backgroundImage}")`;
         backgroundDiv.style.backgroundRepeat = 'repeat';
         backgroundDiv.style.backgroundPosition = '0 0';
         backgroundDiv.style.opacity = '0.25'; // Increased default opacity
         
         // Add mobile-specific adjustments with better visibility
-        if (window.innerWidth <= 900) {
+        if (layout === 'small') {
             backgroundDiv.style.backgroundSize = 'auto 200px'; // Optimized for mobile
             backgroundDiv.style.opacity = '0.15'; // More subtle on mobile
         } else {
@@ -97,23 +115,27 @@ function generateBinaryBackground() {
         backgroundDiv.style.opacity = '0.2';
     };
     
-    testImg.src = './binary-background.png';
+    testImg.src = backgroundImage;
 }
 
-// Tesseract worker - Singleton pattern for efficient OCR processing
-let tesseractWorker = null;
+// Tesseract worker pool - a scheduler that hands each job to the next idle worker
+const OCR_MAX_WORKERS = 4;          // Each worker holds its own copy of the model, so memory caps the pool
+const OCR_STRIP_MIN_HEIGHT = 400;   // Images are only split into strips at least this tall (px)
+let ocrScheduler = null;
+const ocrWorkerStarts = new Set();  // Workers still loading, as promises that settle once each is added or failed
+let ocrJobsRunning = 0;
 
 /**
- * Load and configure Tesseract OCR worker
+ * Load and configure one Tesseract OCR worker for the pool
  * 
- * Uses singleton pattern to ensure only one worker instance exists.
  * Provides error handling and fallback configuration for reliability.
  * 
  * @returns {Promise<Worker>} Configured Tesseract worker instance
  * 
  * Performance considerations:
- * - Worker is created once and reused for all OCR operations
- * - English language model is preloaded for faster processing
+ * - Workers are kept in the pool and reused for all OCR operations
+ * - tesseract.js caches the language model in IndexedDB, so workers on
+ *   later pages and visits start without downloading it again
  * - Logging is enabled for development debugging
  */
 async function loadCustomModel() {
@@ -129,6 +151,205 @@ async function loadCustomModel() {
     }
 }
 
+/**
+ * Number of workers the pool grows to on this device
+ * 
+ * @returns {number} One per CPU core, at most OCR_MAX_WORKERS
+ */
+function ocrPoolSize() {
+    return Math.max(1, Math.min(navigator.hardwareConcurrency || 2, OCR_MAX_WORKERS));
+}
+
+/**
+ * Start one more worker and add it to the pool
+ * 
+ * Jobs queued meanwhile go to whichever worker is free first, so a slow
+ * start never holds a job up when another worker is available.
+ * 
+ * @returns {Promise<void>} Settles once the worker is added or has failed; never rejects
+ */
+function addOcrWorker() {
+    const start = (async () => {
+        try {
+            ocrScheduler.addWorker(await loadCustomModel());
+        } catch (error) {
+            console.error('Failed to start Tesseract worker:', error);
+        } finally {
+            ocrWorkerStarts.delete(start);
+        }
+    })();
+    ocrWorkerStarts.add(start);
+    return start;
+}
+
+/**
+ * Recognize an image on the worker pool
+ * 
+ * The pool is created on first use with one worker and grows lazily, by
+ * one worker each time a job arrives while every worker is busy, up to
+ * ocrPoolSize(). Independent requests (uploads, captures, scan frames,
+ * strips of one image) therefore run side by side.
+ * 
+ * @param {string|HTMLCanvasElement} image - Data URL or canvas to recognize
+ * @returns {Promise<string>} Raw OCR text
+ */
+async function recognizeInPool(image) {
+    if (!ocrScheduler) {
+        ocrScheduler = Tesseract.createScheduler();
+    }
+    const workers = ocrScheduler.getNumWorkers() + ocrWorkerStarts.size;
+    if (workers === 0 || (ocrJobsRunning >= workers && workers < ocrPoolSize())) {
+        addOcrWorker();
+    }
+    // A job queued on a pool without workers would never settle, so wait
+    // for one to load and give up if none could; the next call tries again
+    while (ocrScheduler.getNumWorkers() === 0) {
+        if (ocrWorkerStarts.size === 0) {
+            throw new Error('No Tesseract worker could be started');
+        }
+        await Promise.race(ocrWorkerStarts);
+    }
+    ocrJobsRunning++;
+    try {
+        const { data: { text } } = await ocrScheduler.addJob('recognize', image);
+        return text;
+    } finally {
+        ocrJobsRunning--;
+    }
+}
+
+/**
+ * Find rows at which a tall image can be cut into strips without cutting text
+ * 
+ * Rows with almost no dark pixels are blank. Cuts are aimed at evenly spaced
+ * heights and moved to the nearest blank row; a cut with no blank row nearby
+ * is dropped, so no line of text is ever split between two strips.
+ * 
+ * @param {HTMLCanvasElement} canvas - Grayscale image from preprocessCanvas()
+ * @param {number} maxStrips - Most strips wanted
+ * @returns {number[]} Strip boundaries from 0 to canvas.height
+ */
+function stripBoundaries(canvas, maxStrips) {
+    const { width, height } = canvas;
+    const count = Math.min(maxStrips, Math.floor(height / OCR_STRIP_MIN_HEIGHT));
+    if (count < 2) return [0, height];
+    
+    const data = canvas.getContext('2d').getImageData(0, 0, width, height).data;
+    let total = 0;
+    for (let i = 0; i < data.length; i += 4) total += data[i];
+    const threshold = 0.7 * total / (width * height);
+    const dark = new Uint32Array(height);
+    for (let y = 0, i = 0; y < height; y++) {
+        for (let x = 0; x < width; x++, i += 4) {
+            if (data[i] < threshold) dark[y]++;
+        }
+    }
+    
+    const blank = y => dark[y] <= width * 0.002;
+    const reach = Math.floor(height / (2 * count));
+    const bounds = [0];
+    for (let k = 1; k < count; k++) {
+        const target = Math.round(k * height / count);
+        for (let d = 0; d < reach; d++) {
+            const y = blank(target - d) ? target - d : blank(target + d) ? target + d : -1;
+            if (y > bounds[bounds.length - 1]) {
+                bounds.push(y);
+                break;
+            }
+        }
+    }
+    bounds.push(height);
+    return bounds;
+}
+
+/**
+ * Recognize a canvas, splitting a tall one into strips recognized in parallel
+ * 
+ * @param {HTMLCanvasElement} canvas - Preprocessed image
+ * @returns {Promise<string>} Raw OCR text of all strips, top to bottom
+ */
+async function recognizeCanvas(canvas) {
+    const bounds = stripBoundaries(canvas, ocrPoolSize());
+    if (bounds.length === 2) {
+        return recognizeInPool(canvas.toDataURL('image/png'));
+    }
+    const jobs = [];
+    for (let i = 0; i + 1 < bounds.length; i++) {
+        const strip = document.createElement('canvas');
+        strip.width = canvas.width;
+        strip.height = bounds[i + 1] - bounds[i];
+        strip.getContext('2d').drawImage(canvas, 0, bounds[i], strip.width, strip.height, 0, 0, strip.width, strip.height);
+        jobs.push(recognizeInPool(strip.toDataURL('image/png')));
+    }
+    console.log(`Recognizing ${jobs.length} strips in parallel`);
+    return (await Promise.all(jobs)).join('\n');
+}
+
+// localStorage key remembering the OCR service this device opted into
+const OCR_SERVICE_KEY = 'ocrService';
+
+/**
+ * Get the server-side OCR endpoint this device has opted into
+ * 
+ * Opening any page with ?ocr-service=<url> remembers the service
+ * (tesseract-training/ocr_service.py) for later visits; ?ocr-service=off
+ * forgets it. Without it all OCR stays in the browser.
+ * 
+ * @returns {string|null} Service endpoint, e.g. http://192.168.1.5:8765/ocr
+ */
+function getOcrServiceUrl() {
+    try {
+        const param = new URLSearchParams(window.location.search).get('ocr-service');
+        if (param === 'off') {
+            localStorage.removeItem(OCR_SERVICE_KEY);
+        } else if (param) {
+            localStorage.setItem(OCR_SERVICE_KEY, param);
+        }
+        return localStorage.getItem(OCR_SERVICE_KEY);
+    } catch (error) {
+        // Storage can be disabled, e.g. in private browsing
+        return new URLSearchParams(window.location.search).get('ocr-service');
+    }
+}
+
+/**
+ * Recognize an image on the OCR service
+ * 
+ * Uploads the image as PNG and returns the raw OCR text, which is then
+ * decoded exactly like local results. A busy service (503) is retried once
+ * after its Retry-After delay.
+ * 
+ * @param {string} serviceUrl - Endpoint from getOcrServiceUrl()
+ * @param {string} imageDataUrl - Base64 encoded image data URL
+ * @returns {Promise<string|null>} Raw OCR text, or null to fall back to the local worker
+ */
+async function recognizeOnServer(serviceUrl, imageDataUrl) {
+    try {
+        const image = await (await fetch(imageDataUrl)).blob();
+        for (let attempt = 0; attempt < 2; attempt++) {
+            const response = await fetch(serviceUrl, {
+                method: 'POST',
+                headers: { 'Content-Type': image.type || 'image/png' },
+                body: image
+            });
+            if (response.ok) {
+                const result = await response.json();
+                console.log(`OCR service answered in ${result.ms} ms`);
+                return result.text;
+            }
+            if (response.status !== 503) {
+                break;
+            }
+            const delay = Number(response.headers.get('Retry-After')) || 1;
+            await new Promise(resolve => setTimeout(resolve, delay * 1000));
+        }
+        console.warn('OCR service unavailable, using the local worker');
+    } catch (error) {
+        console.warn('OCR service unreachable, using the local worker:', error);
+    }
+    return null;
+}
+
 /**
  * Perform OCR processing on image data
  * 
@@ -138,29 +359,31 @@ async function loadCustomModel() {
  * - Error handling and fallback responses
  * - Integration with binary conversion pipeline
  * 
- * @param {string} imageDataUrl - Base64 encoded image data URL
+ * @param {string|HTMLCanvasElement} image - Base64 encoded image data URL, or a preprocessed canvas
  * @returns {Promise<string>} Decoded ASCII text or error message
  * 
  * Processing pipeline:
- * 1. Initialize Tesseract worker if not already loaded
- * 2. Pass image data to OCR recognition engine
+ * 1. Send the image to the OCR service if this device opted into one
+ * 2. Otherwise (or if the service fails) use the worker pool; a tall canvas is split into strips
  * 3. Normalize extracted text (remove extra whitespace)
  * 4. Apply binary conversion with error correction
  * 5. Return final ASCII result or appropriate error message
  */
-async function performOCR(imageDataUrl) {
-    if (!tesseractWorker) {
-        tesseractWorker = await loadCustomModel();
-    }
-    
+async function performOCR(image) {
     try {
-        const { data: { text } } = await tesseractWorker.recognize(imageDataUrl);
+        const isCanvas = typeof image !== 'string';
+        const serviceUrl = getOcrServiceUrl();
+        let text = serviceUrl ? await recognizeOnServer(serviceUrl, isCanvas ? image.toDataURL('image/png') : image) : null;
+        if (text === null) {
+            text = isCanvas ? await recognizeCanvas(image) : await recognizeInPool(image);
+        }
         console.log("Raw Tesseract OCR result:", text);
         
         const binaryStr = text.replace(/\s+/g, ' ').trim();
         console.log("Normalized OCR text:", binaryStr);
         
-        const ascii = binaryToAscii(binaryStr);
+        // OCR regularly drops bits or spaces on long walls, so recover alignment
+        const ascii = binaryToAscii(binaryStr, false, true);
         return ascii || '// No valid binary detected';
     } catch (error) {
         console.error("OCR error:", error);
@@ -168,6 +391,99 @@ async function performOCR(imageDataUrl) {
     }
 }
 
+// Scanner character classes: OCR confusables count as the bit they look like
+const BIT_SPACE = 2;    // Whitespace, which ends a group
+const BIT_SKIP = 3;     // Any other character; dropped without splitting its group
+const CHAR_CLASS = (() => {
+    const table = new Uint8Array(128).fill(BIT_SKIP);
+    for (const c of '0OoQD[]') table[c.charCodeAt(0)] = 0;   // Circular/bracket shapes → 0
+    for (const c of '1lI|!') table[c.charCodeAt(0)] = 1;     // Vertical lines → 1
+    for (const c of ' \t\n\v\f\r') table[c.charCodeAt(0)] = BIT_SPACE;
+    return table;
+})();
+
+// Strict, so text that isn't UTF-8 falls back to one character per byte
+const UTF8_DECODER = new TextDecoder('utf-8', { fatal: true });
+
+function charClass(code) {
+    if (code < 128) return CHAR_CLASS[code];
+    // The rest of what the \s regex class counts as whitespace
+    const space = code === 0xa0 || code === 0x1680 || (code >= 0x2000 && code <= 0x200a) ||
+        code === 0x2028 || code === 0x2029 || code === 0x202f || code === 0x205f || code === 0x3000 || code === 0xfeff;
+    return space ? BIT_SPACE : BIT_SKIP;
+}
+
+/**
+ * Scan text[from, to) once, splitting it into whitespace-separated bit groups
+ * 
+ * @param {string} text - Binary text, possibly with OCR errors
+ * @param {number} from - First character to scan; must start a group or follow whitespace
+ * @param {number} to - End of the scan; must end a group or be whitespace
+ * @param {Uint8Array} bits - Optional buffer (at least to - from long) that receives every bit
+ * @param {Uint8Array} groupStarts - Set to 1 where a bit starts a group, when bits is given
+ * @returns {{starts: number[], ends: number[], values: number[], bitCount: number}}
+ *   Character range and byte value of each group holding any bits; value is -1
+ *   unless the group is exactly 8 bits long
+ */
+function scanBinaryGroups(text, from = 0, to = text.length, bits = null, groupStarts = null) {
+    const starts = [], ends = [], values = [];
+    let bitCount = 0, length = 0, value = 0, start = -1;
+    for (let i = from; i <= to; i++) {
+        const cls = i < to ? charClass(text.charCodeAt(i)) : BIT_SPACE;
+        if (cls === BIT_SPACE) {
+            if (length) {
+                starts.push(start);
+                ends.push(i);
+                values.push(length === 8 ? value : -1);
+            }
+            start = -1;
+            length = value = 0;
+            continue;
+        }
+        if (start < 0) start = i;
+        if (cls === BIT_SKIP) continue;
+        if (bits) {
+            if (length === 0) groupStarts[bitCount] = 1;
+            bits[bitCount++] = cls;
+        }
+        value = ((value << 1) | cls) & 0xff;
+        length++;
+    }
+    return { starts, ends, values, bitCount };
+}
+
+/**
+ * Turn decoded bytes into text
+ * 
+ * Valid UTF-8 is decoded as such, so multi-byte characters come out whole;
+ * anything else maps one byte to one character (Latin-1).
+ */
+function bytesToText(bytes, printableOnly = false) {
+    if (printableOnly) {
+        let kept = 0;
+        for (const b of bytes) if (b >= 32 && b <= 126) bytes[kept++] = b;
+        bytes = bytes.subarray(0, kept);
+    }
+    try {
+        return UTF8_DECODER.decode(bytes);
+    } catch (e) {
+        let text = '';
+        for (let i = 0; i < bytes.length; i += 8192) {
+            text += String.fromCharCode.apply(null, bytes.subarray(i, i + 8192));
+        }
+        return text;
+    }
+}
+
+function groupBytes(values) {
+    let count = 0;
+    for (const v of values) if (v >= 0) count++;
+    const bytes = new Uint8Array(count);
+    let i = 0;
+    for (const v of values) if (v >= 0) bytes[i++] = v;
+    return bytes;
+}
+
 /**
  * Convert binary string to ASCII text with comprehensive error correction
  * 
@@ -179,63 +495,184 @@ async function performOCR(imageDataUrl) {
  * 
  * @param {string} binaryStr - Input binary string (may contain OCR errors and formatting)
  * @param {boolean} printableOnly - Filter to only printable ASCII characters (32-126)
+ * @param {boolean} realign - Recover byte alignment when groups aren't all 8 bits (see realignBits)
  * @returns {string} Decoded ASCII text or empty string if no valid binary found
  * 
- * OCR Error Correction Patterns:
+ * OCR Error Correction Patterns (looked up in CHAR_CLASS):
  * - l, I, |, ! → 1 (vertical line characters commonly misread as binary 1)
  * - O, o, Q, D, [, ] → 0 (circular/bracket characters misread as binary 0)
- * - OI → 01, IO → 10, Ol → 01, lO → 10 (common adjacent character mistakes)
+ * - Any other non-space character is dropped
  * 
  * Validation Rules:
- * - Only processes valid 8-bit binary groups (exactly 8 characters of 0s and 1s)
+ * - Only processes valid 8-bit binary groups (exactly 8 bits after correction)
  * - Requires space separation between groups for accurate parsing
- * - Filters out any non-binary characters after correction
+ * - With realign, unspaced or broken groups are decoded as one bitstream instead
  * 
- * ASCII Conversion:
- * - Converts each valid 8-bit binary to decimal (0-255)
- * - Maps decimal to corresponding ASCII character
+ * Conversion:
+ * - The input is scanned once, with each group's bits packed straight into a byte
+ * - The bytes are decoded with TextDecoder (see bytesToText)
  * - Optionally filters to printable range (32-126) for display
  */
-function binaryToAscii(binaryStr, printableOnly = false) {
-    console.log("Input binary string:", binaryStr);
-    
-    // Step 1: Apply OCR error corrections
-    let cleaned = binaryStr
-        .replace(/[lI|!]/g, '1')      // Vertical lines → 1
-        .replace(/[OoQD\[\]]/g, '0')  // Circular shapes → 0
-        .replace(/OI/g, '01')         // Adjacent char corrections
-        .replace(/IO/g, '10')
-        .replace(/Ol/g, '01')
-        .replace(/lO/g, '10')
-        .replace(/[^01\s]/g, '')      // Remove non-binary characters
-        .replace(/\s+/g, ' ')         // Normalize whitespace
-        .trim();
-    
-    console.log("After OCR corrections:", cleaned);
-    
-    // Step 2: Extract and validate 8-bit binary groups
-    const words = cleaned.split(/\s+/).filter(word => word.length > 0);
-    const validBinaries = words.filter(w => w.length === 8 && /^[01]{8}$/.test(w));
-    
-    if (validBinaries.length === 0) {
-        return '';
+function binaryToAscii(binaryStr, printableOnly = false, realign = false) {
+    const bits = realign ? new Uint8Array(binaryStr.length) : null;
+    const groupStarts = realign ? new Uint8Array(binaryStr.length) : null;
+    const groups = scanBinaryGroups(binaryStr, 0, binaryStr.length, bits, groupStarts);
+    const bytes = groupBytes(groups.values);
+
+    if (realign && bytes.length < groups.values.length) {
+        // Broken or unspaced groups - decode as one realigned bitstream
+        return bytesToText(realignBits(bits.subarray(0, groups.bitCount), groupStarts), printableOnly);
     }
-    
-    // Step 3: Convert binary groups to ASCII characters
-    let ascii = validBinaries.map(bin => {
-        const charCode = parseInt(bin, 2);
-        return String.fromCharCode(charCode);
-    }).join('');
-    
-    // Step 4: Optional filtering to printable characters only
-    if (printableOnly) {
-        ascii = ascii.split('').filter(c => {
-            const code = c.charCodeAt(0);
-            return code >= 32 && code <= 126;
-        }).join('');
+    return bytesToText(bytes, printableOnly);
+}
+
+/**
+ * Decoder for text that is edited a little at a time, like the text input page
+ * 
+ * Keeps the groups found in the previous text. On each call only the span
+ * that changed, widened to whole groups, is scanned again; groups after it
+ * are kept and just moved by the change in length. Pasting into or typing
+ * at the end of a long input costs about the size of the edit.
+ * 
+ * @returns {{decode: function(string, boolean=): string}} Same output as binaryToAscii(text, printableOnly)
+ */
+function createBinaryDecoder() {
+    let text = '';
+    let groups = { starts: [], ends: [], values: [] };
+
+    // First group starting at or after position
+    const groupAt = position => {
+        let lo = 0, hi = groups.starts.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (groups.starts[mid] < position) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    };
+
+    const decode = (next, printableOnly = false) => {
+        const shortest = Math.min(text.length, next.length);
+        let prefix = 0;
+        while (prefix < shortest && text.charCodeAt(prefix) === next.charCodeAt(prefix)) prefix++;
+        let suffix = 0;
+        while (suffix < shortest - prefix &&
+               text.charCodeAt(text.length - 1 - suffix) === next.charCodeAt(next.length - 1 - suffix)) suffix++;
+
+        if (prefix < next.length || text.length !== next.length) {
+            // Widen the changed span to whitespace on both sides, so it holds whole groups
+            let from = prefix;
+            let to = next.length - suffix;
+            while (from > 0 && charClass(next.charCodeAt(from - 1)) !== BIT_SPACE) from--;
+            while (to < next.length && charClass(next.charCodeAt(to)) !== BIT_SPACE) to++;
+
+            const delta = next.length - text.length;
+            const first = groupAt(from);
+            const last = groupAt(to - delta);
+            const scanned = scanBinaryGroups(next, from, to);
+            for (const key of ['starts', 'ends', 'values']) {
+                const list = groups[key];
+                const tail = list.splice(last, list.length - last);
+                list.length = first;
+                for (const v of scanned[key]) list.push(v);
+                for (const v of tail) list.push(key === 'values' ? v : v + delta);
+            }
+            text = next;
+        }
+        return bytesToText(groupBytes(groups.values), printableOnly);
+    };
+
+    return { decode };
+}
+
+// Byte alignment recovery settings (mirrors realign_bits() in tesseract-training/ocr_decode.py)
+const GROUP_START_BONUS = 3;        // Score bonus for a byte starting on a spaced group
+const SHIFT_PENALTY = 2;            // Score a realignment must gain over the current one
+const REALIGN_OFFSETS = [0, 1, -1, 2, -2, 3, -3, 4];   // Nearest first, so ties keep the nearer one
+
+// How much each byte value looks like English text
+const BYTE_SCORES = (() => {
+    const scores = new Float64Array(256).fill(-4);
+    for (let c = 33; c < 127; c++) scores[c] = 0.5;
+    for (const c of [9, 10, 13]) scores[c] = 0.5;
+    for (let c = 48; c < 58; c++) scores[c] = 1;
+    for (let c = 65; c < 91; c++) scores[c] = 2;
+    for (let c = 97; c < 123; c++) scores[c] = 2;
+    scores[32] = 2;
+    for (let c = 128; c < 256; c++) scores[c] = -1;
+    return scores;
+})();
+
+/**
+ * Decode a bitstream whose byte boundaries may be lost or shifted
+ * 
+ * Recovers text when OCR drops or inserts bits, or misses the spaces between
+ * groups, instead of discarding every group that isn't exactly 8 bits long.
+ * 
+ * @param {Uint8Array} bits - One 0/1 value per bit
+ * @param {Uint8Array} groupStarts - 1 where a bit started a space-separated group
+ * @returns {Uint8Array} Decoded bytes
+ * 
+ * Algorithm:
+ * 1. Score the byte starting at every bit position by how printable it is,
+ *    plus a bonus where the input had a space
+ * 2. Find the best-scoring chain of positions from the first byte to the
+ *    last, where each byte starts 8 bits after the previous one, or 3 bits
+ *    before to 4 bits after that at a cost of SHIFT_PENALTY
+ * 3. Every slip, even one in the first few bytes, is placed using the bits
+ *    on both sides of it
+ *
+ * Ties are broken as in realign_bits(): a position prefers a fresh start,
+ * then the offsets in REALIGN_OFFSETS order, and the chain ends at the
+ * earliest best final position. tesseract-training/realign_vectors.json
+ * holds inputs both must decode the same way (node check-realign.js).
+ */
+function realignBits(bits, groupStarts) {
+    const n = bits.length;
+    if (n < 8) return new Uint8Array(0);
+
+    // Byte value and score at every bit position
+    const count = n - 7;
+    const values = new Uint8Array(count);
+    const score = new Float64Array(count);
+    let v = 0;
+    for (let i = 0; i < n; i++) {
+        v = ((v << 1) | bits[i]) & 0xff;
+        const p = i - 7;
+        if (p >= 0) {
+            values[p] = v;
+            score[p] = BYTE_SCORES[v] + (groupStarts && groupStarts[p] ? GROUP_START_BONUS : 0);
+        }
     }
-    
-    return ascii;
+
+    // best[p]: score of the best chain ending with the byte at p; back[p]: the byte before it
+    const best = new Float64Array(count);
+    const back = new Int32Array(count);
+    for (let p = 0; p < count; p++) {
+        let total = p < 8 ? 0 : -Infinity;
+        let previous = -1;
+        for (const shift of REALIGN_OFFSETS) {
+            const q = p - 8 - shift;
+            if (q < 0) continue;
+            const candidate = shift ? best[q] - SHIFT_PENALTY : best[q];
+            if (candidate > total) {
+                total = candidate;
+                previous = q;
+            }
+        }
+        best[p] = total + score[p];
+        back[p] = previous;
+    }
+
+    // The last byte is one no unshifted byte can follow
+    let end = Math.max(count - 8, 0);
+    for (let p = end + 1; p < count; p++) {
+        if (best[p] > best[end]) end = p;
+    }
+    const positions = [];
+    for (let p = end; p >= 0; p = back[p]) positions.push(p);
+    positions.reverse();
+    return Uint8Array.from(positions, p => values[p]);
 }
 
 /**
@@ -289,7 +726,7 @@ function preprocessCanvas(canvas, debugCanvas) {
  * Processing pipeline:
  * 1. Scale image 2x for better OCR accuracy
  * 2. Apply grayscale preprocessing
- * 3. Convert to data URL for Tesseract processing
+ * 3. Hand the canvas to performOCR(), which splits tall images into strips
  * 4. Update UI with processing status
  * 5. Display final decoded results
  */
@@ -306,9 +743,8 @@ function runOcrOnCanvas(canvas) {
     
     // Apply preprocessing and perform OCR
     preprocessCanvas(tempCanvas, document.getElementById('processedCanvas'));
-    const imageDataUrl = tempCanvas.toDataURL('image/png');
     
-    performOCR(imageDataUrl).then(result => {
+    performOCR(tempCanvas).then(result => {
         document.getElementById('decodedText').textContent = result;
     });
 }
@@ -328,6 +764,7 @@ function runOcrOnCanvas(canvas) {
  * - Waits for complete image load before processing
  * - Uses natural dimensions for accurate scaling
  * - Applies 2x scaling factor for OCR optimization
+ * - Large photos are cut into strips that the worker pool recognizes in parallel
  * - Handles both immediate and delayed image loading
  */
 function runOcrOnImage(img) {
@@ -344,10 +781,9 @@ function runOcrOnImage(img) {
         canvas.style.display = 'none';
         
         preprocessCanvas(canvas, document.getElementById('processedCanvas'));
-        const imageDataUrl = canvas.toDataURL('image/png');
         
         document.getElementById('decodedText').textContent = 'Scanning...';
-        const result = await performOCR(imageDataUrl);
+        const result = await performOCR(canvas);
         document.getElementById('decodedText').textContent = result;
     };
     
@@ -359,6 +795,176 @@ function runOcrOnImage(img) {
     }
 }
 
+// Live scanning: each camera frame is reduced to a 64-bit difference hash before any OCR runs
+const SCAN_FRAME_SIZE = 640;        // Square crop from the middle of the camera frame
+const SCAN_HASH_DISTANCE = 6;       // Hash bits that may differ before a frame counts as changed
+const SCAN_CACHE_SIZE = 32;         // Recent frame hash -> decoded text results kept
+const SCAN_MIN_INTERVAL = 250;      // Fastest frame check, in ms
+const SCAN_MAX_INTERVAL = 4000;     // Longest pause after a recognition, in ms
+const SCAN_LATENCY_FACTOR = 1.5;    // Pause after a recognition, relative to the average OCR time
+
+// Set bits per byte value, for Hamming distances between hashes
+const POPCOUNT = Uint8Array.from({ length: 256 }, (_, i) => {
+    let count = 0;
+    for (let v = i; v; v >>= 1) count += v & 1;
+    return count;
+});
+
+/**
+ * Compute a difference hash (dHash) of a canvas
+ * 
+ * The image is shrunk to 9x8 grey cells, by averaging 4x4 pixel blocks of
+ * a 36x32 copy, and each bit records whether a cell is brighter than its
+ * right neighbour. Camera noise and small exposure changes leave the hash
+ * alone, while moving to different text flips many bits.
+ * 
+ * @param {HTMLCanvasElement} canvas - Frame to hash
+ * @returns {Uint8Array} 8-byte hash
+ */
+function frameHash(canvas) {
+    if (!frameHash.canvas) {
+        frameHash.canvas = document.createElement('canvas');
+        frameHash.canvas.width = 36;
+        frameHash.canvas.height = 32;
+    }
+    const ctx = frameHash.canvas.getContext('2d', { willReadFrequently: true });
+    ctx.drawImage(canvas, 0, 0, 36, 32);
+    const pixels = ctx.getImageData(0, 0, 36, 32).data;
+    
+    const cells = new Float32Array(72);
+    for (let y = 0; y < 32; y++) {
+        for (let x = 0; x < 36; x++) {
+            const i = (y * 36 + x) * 4;
+            cells[(y >> 2) * 9 + (x >> 2)] += pixels[i] * 0.299 + pixels[i + 1] * 0.587 + pixels[i + 2] * 0.114;
+        }
+    }
+    const hash = new Uint8Array(8);
+    for (let row = 0; row < 8; row++) {
+        for (let col = 0; col < 8; col++) {
+            if (cells[row * 9 + col] > cells[row * 9 + col + 1]) {
+                hash[row] |= 1 << col;
+            }
+        }
+    }
+    return hash;
+}
+
+/**
+ * Count the bits that differ between two frame hashes
+ * 
+ * @param {Uint8Array} a - Hash from frameHash()
+ * @param {Uint8Array} b - Hash from frameHash()
+ * @returns {number} Hamming distance, 0-64
+ */
+function hashDistance(a, b) {
+    let distance = 0;
+    for (let i = 0; i < 8; i++) distance += POPCOUNT[a[i] ^ b[i]];
+    return distance;
+}
+
+/**
+ * Scan a live camera feed, only running OCR when the view has changed
+ * 
+ * Scheduling rules:
+ * - Every check hashes the frame; OCR only runs once the view is steady
+ *   (two similar frames in a row) and differs from the one on screen
+ * - A view seen recently is answered from an LRU of hash -> decoded text
+ * - A recognition never starts while another one is running; the next
+ *   check is scheduled only when the current one has finished
+ * - After a recognition, the next check waits 1.5x the average OCR time,
+ *   so slow phones scan less often; hidden pages don't scan at all
+ * 
+ * @param {HTMLVideoElement} video - Camera feed
+ * @param {function(string): void} onResult - Receives each decoded text
+ * @param {function(Object): void} onStats - Receives scan counters after each check
+ * @returns {{stop: function(): void}} Handle that ends the scan
+ */
+function startScanScheduler(video, onResult, onStats = () => {}) {
+    const canvas = document.createElement('canvas');
+    canvas.width = SCAN_FRAME_SIZE;
+    canvas.height = SCAN_FRAME_SIZE;
+    const ctx = canvas.getContext('2d', { willReadFrequently: true });
+    
+    const cache = new Map();    // Hex hash -> [hash, text], oldest first
+    const stats = { frames: 0, skipped: 0, cached: 0, recognized: 0, averageMs: null };
+    let previousHash = null;    // Last frame checked
+    let shownHash = null;       // Frame whose text is on screen
+    let timer = null;
+    let stopped = false;
+    
+    function lookup(hash) {
+        for (const [key, [cachedHash, text]] of cache) {
+            if (hashDistance(hash, cachedHash) <= SCAN_HASH_DISTANCE) {
+                // Move to the back so the least recently used entry goes first
+                cache.delete(key);
+                cache.set(key, [cachedHash, text]);
+                return text;
+            }
+        }
+        return null;
+    }
+    
+    function remember(hash, text) {
+        const key = Array.from(hash, b => b.toString(16).padStart(2, '0')).join('');
+        cache.delete(key);
+        cache.set(key, [hash, text]);
+        if (cache.size > SCAN_CACHE_SIZE) {
+            cache.delete(cache.keys().next().value);
+        }
+    }
+    
+    async function check() {
+        let delay = SCAN_MIN_INTERVAL;
+        if (!document.hidden && video.readyState === video.HAVE_ENOUGH_DATA) {
+            const vw = video.videoWidth || SCAN_FRAME_SIZE;
+            const vh = video.videoHeight || SCAN_FRAME_SIZE;
+            const sx = Math.floor((vw - SCAN_FRAME_SIZE) / 2);
+            const sy = Math.floor((vh - SCAN_FRAME_SIZE) / 2);
+            ctx.drawImage(video, sx, sy, SCAN_FRAME_SIZE, SCAN_FRAME_SIZE, 0, 0, SCAN_FRAME_SIZE, SCAN_FRAME_SIZE);
+            
+            const hash = frameHash(canvas);
+            const steady = previousHash && hashDistance(hash, previousHash) <= SCAN_HASH_DISTANCE;
+            const shown = shownHash && hashDistance(hash, shownHash) <= SCAN_HASH_DISTANCE;
+            previousHash = hash;
+            stats.frames++;
+            
+            if (!steady || shown) {
+                stats.skipped++;
+            } else {
+                let text = lookup(hash);
+                if (text !== null) {
+                    stats.cached++;
+                } else {
+                    const start = performance.now();
+                    text = await performOCR(canvas.toDataURL('image/png'));
+                    const elapsed = performance.now() - start;
+                    stats.recognized++;
+                    stats.averageMs = stats.averageMs === null ? elapsed : 0.7 * stats.averageMs + 0.3 * elapsed;
+                    if (text !== '// OCR error') {
+                        remember(hash, text);
+                    }
+                    delay = Math.min(Math.max(stats.averageMs * SCAN_LATENCY_FACTOR, SCAN_MIN_INTERVAL), SCAN_MAX_INTERVAL);
+                }
+                if (stopped) return;
+                shownHash = hash;
+                onResult(text);
+            }
+            onStats(stats);
+        }
+        if (!stopped) {
+            timer = setTimeout(check, delay);
+        }
+    }
+    
+    check();
+    return {
+        stop() {
+            stopped = true;
+            clearTimeout(timer);
+        }
+    };
+}
+
 /**
  * Initialize application on page load
  * 
@@ -382,13 +988,6 @@ function runOcrOnImage(img) {
 window.onload = async () => {
     generateBinaryBackground();
     
-    try {
-        tesseractWorker = await loadCustomModel();
-        console.log('Tesseract worker loaded successfully');
-    } catch (error) {
-        console.error('Failed to load Tesseract worker:', error);
-    }
-    
     // Add resize listener for dynamic background updates
     window.addEventListener('resize', () => {
         setTimeout(generateBinaryBackground, 100);
@@ -398,11 +997,26 @@ window.onload = async () => {
     window.addEventListener('orientationchange', () => {
         setTimeout(generateBinaryBackground, 300);
     });
+    
+    // Pages without tesseract.js (e.g. text input) have no OCR to warm up.
+    // Devices using the OCR service only start workers if the service fails;
+    // others warm up the first worker, and the pool grows when jobs overlap
+    if (typeof Tesseract !== 'undefined' && !getOcrServiceUrl() && !ocrScheduler) {
+        try {
+            ocrScheduler = Tesseract.createScheduler();
+            await addOcrWorker();
+            if (ocrScheduler.getNumWorkers()) {
+                console.log('Tesseract worker loaded successfully');
+            }
+        } catch (error) {
+            console.error('Failed to load Tesseract worker:', error);
+        }
+    }
 };
 
 // Force background regeneration when page becomes visible (for mobile browsers)
 document.addEventListener('visibilitychange', () => {
     if (!document.hidden) {
-        setTimeout(generateBinaryBackground, 100);
+        setTimeout(() => generateBinaryBackground(true), 100);
     }
 });
@@ -0,0 +1,218 @@
+import io
+import os
+import re
+import json
+import shutil
+import hashlib
+import argparse
+import subprocess
+import tempfile
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(ROOT, "dist")
+
+# Background tile heights in pixels per layout: about 2x the CSS size in binary-decoder.js
+# (200px on mobile, 400px on desktop), capped at the source height
+BACKGROUND_VARIANTS = {"small": 400, "large": 800}
+WEBP_QUALITY = 80
+# The faint background survives a palette; it makes the PNG fallbacks several times smaller
+PNG_COLORS = 64
+
+# QR code PNG widths; the 300px default is always generated too
+QR_WIDTHS = [150, 600]
+
+HASH_LENGTH = 10
+
+
+def hashed_name(name, data):
+    """style.css -> style.<hash>.css, with the hash taken from the contents"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def emit(name, data, output_dir, manifest, key=None):
+    """Write data under its content-hashed name and record it in the manifest"""
+    output = hashed_name(name, data)
+    with open(os.path.join(output_dir, output), "wb") as f:
+        f.write(data)
+    manifest[key or name] = output
+    return output
+
+
+def minify_css(css):
+    """Drop comments and collapse whitespace; selectors and values are left intact"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+# Characters after which a / starts a regular expression rather than a division
+_REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORD = re.compile(r"(^|[^\w$])(return|typeof|case|do|else|in|of|void|yield|await)$")
+
+
+def minify_js(js):
+    """Remove comments, indentation and blank lines, keeping every statement on its own line
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the source. Strings, template literals and regular expressions are
+    copied untouched.
+    """
+    out = []
+    i, n = 0, len(js)
+    while i < n:
+        c = js[i]
+        if c in "'\"`":
+            end = i + 1
+            while end < n and js[end] != c:
+                end += 2 if js[end] == "\\" else 1
+            out.append(js[i:end + 1])
+            i = end + 1
+        elif js.startswith("//", i):
+            i = js.find("\n", i)
+            i = n if i < 0 else i
+        elif js.startswith("/*", i):
+            end = js.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            out.append(" ")
+        elif c == "/":
+            previous = "".join(out).rstrip()
+            if not previous or previous[-1] in _REGEX_PREFIX or _REGEX_KEYWORD.search(previous):
+                end, in_class = i + 1, False
+                while end < n and (js[end] != "/" or in_class):
+                    if js[end] == "\\":
+                        end += 1
+                    elif js[end] == "[":
+                        in_class = True
+                    elif js[end] == "]":
+                        in_class = False
+                    end += 1
+                out.append(js[i:end + 1])
+                i = end + 1
+            else:
+                out.append(c)
+                i += 1
+        else:
+            end = i
+            while end < n and js[end] not in "'\"`/":
+                end += 1
+            out.append(js[i:end])
+            i = end
+    lines = (line.strip() for line in "".join(out).splitlines())
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+def build_backgrounds(output_dir, manifest):
+    """Pre-sized WebP and PNG tiles of binary-background.png for each layout
+
+    The pages reference whichever of the two came out smaller, recorded in
+    the manifest as binary-background.<layout>.
+    """
+    source = Image.open(os.path.join(ROOT, "binary-background.png"))
+    for layout, height in BACKGROUND_VARIANTS.items():
+        height = min(height, source.height)
+        width = round(source.width * height / source.height)
+        # Box filtering averages thin glyph strokes instead of ringing, which keeps tiles compressible
+        img = source.resize((width, height), Image.BOX) if height != source.height else source
+        for fmt, ext, variant, options in (("WEBP", ".webp", img, {"quality": WEBP_QUALITY, "method": 6}),
+                                           ("PNG", ".png", img.quantize(PNG_COLORS), {"optimize": True})):
+            buffer = io.BytesIO()
+            variant.save(buffer, format=fmt, **options)
+            emit(f"binary-background.{layout}{ext}", buffer.getvalue(), output_dir, manifest)
+        manifest[f"binary-background.{layout}"] = min(
+            (manifest[f"binary-background.{layout}{ext}"] for ext in (".webp", ".png")),
+            key=lambda name: os.path.getsize(os.path.join(output_dir, name)),
+        )
+
+
+def build_qr_codes(output_dir, manifest):
+    """QR code SVG and PNG sizes from generate-qr.js, or the committed files without Node"""
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            subprocess.run(["node", os.path.join(ROOT, "generate-qr.js"), tmp] + [str(w) for w in QR_WIDTHS],
+                           check=True, capture_output=True, cwd=ROOT)
+            source_dir = tmp
+        except OSError as e:
+            print(f"Could not run node ({e}); using the committed qr-code files")
+            source_dir = ROOT
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.decode("utf-8", errors="replace").strip().splitlines()
+            print(f"generate-qr.js exited with {e.returncode}; using the committed qr-code files")
+            if error:
+                print(f"  {error[0]}")
+            source_dir = ROOT
+        for name in sorted(os.listdir(source_dir)):
+            if name.startswith("qr-code.") and name.endswith((".png", ".svg")):
+                with open(os.path.join(source_dir, name), "rb") as f:
+                    emit(name, f.read(), output_dir, manifest)
+
+
+def read_text(name):
+    with open(os.path.join(ROOT, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def build_scripts(output_dir, manifest):
+    """Minified style.css and binary-decoder.js, the latter pointing at the hashed backgrounds"""
+    emit("style.css", minify_css(read_text("style.css")).encode("utf-8"), output_dir, manifest)
+
+    js = read_text("binary-decoder.js")
+    for layout in BACKGROUND_VARIANTS:
+        js, count = re.subn(rf"({layout}: )'\./binary-background\.png'",
+                            rf"\1'./{manifest[f'binary-background.{layout}']}'", js)
+        if count != 1:
+            raise RuntimeError(f"BACKGROUND_IMAGES.{layout} not found in binary-decoder.js")
+    emit("binary-decoder.js", minify_js(js).encode("utf-8"), output_dir, manifest)
+
+
+def build_pages(output_dir, manifest):
+    """Copy every page with its asset references rewritten to the hashed names"""
+    replacements = {
+        'href="style.css"': f'href="{manifest["style.css"]}"',
+        'src="binary-decoder.js"': f'src="{manifest["binary-decoder.js"]}"',
+        "url('binary-background.png')": f"url('{manifest['binary-background.large']}')",
+    }
+    pages = sorted(name for name in os.listdir(ROOT) if name.endswith(".html"))
+    for name in pages:
+        html = read_text(name)
+        for old, new in replacements.items():
+            html = html.replace(old, new)
+        with open(os.path.join(output_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+    return pages
+
+
+def build(output_dir=DIST_DIR):
+    """Build the deployable site into output_dir; return the asset manifest"""
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+
+    manifest = {}
+    build_backgrounds(output_dir, manifest)
+    build_qr_codes(output_dir, manifest)
+    build_scripts(output_dir, manifest)
+    pages = build_pages(output_dir, manifest)
+    shutil.copytree(os.path.join(ROOT, "tessdata"), os.path.join(output_dir, "tessdata"))
+
+    with open(os.path.join(output_dir, "asset-manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    total = sum(os.path.getsize(os.path.join(output_dir, name)) for name in set(manifest.values()))
+    print(f"Built {len(pages)} pages and {len(set(manifest.values()))} hashed assets ({total / 1024:.0f} KB) into {output_dir}")
+    for source, output in sorted(manifest.items()):
+        print(f"  {source:32} -> {output} ({os.path.getsize(os.path.join(output_dir, output)) / 1024:.1f} KB)")
+    return manifest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build hashed, pre-sized and minified assets for deployment")
+    parser.add_argument('--output', default=DIST_DIR, help="Output folder, replaced on every build (default: dist)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    build(args.output)
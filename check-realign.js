@@ -0,0 +1,32 @@
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+// Usage: node check-realign.js
+// Decodes the vectors shared with tesseract-training/ocr_decode.py (python ocr_decode.py checks the other side)
+const vectorsPath = path.join(__dirname, 'tesseract-training', 'realign_vectors.json');
+
+// binary-decoder.js is a browser script; it only needs these globals to load
+const context = {
+    console,
+    TextDecoder,
+    URLSearchParams,
+    window: {},
+    document: { addEventListener() {} },
+};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(path.join(__dirname, 'binary-decoder.js'), 'utf8'), context);
+
+const vectors = JSON.parse(fs.readFileSync(vectorsPath, 'utf8'));
+let failures = 0;
+for (const vector of vectors) {
+    const bits = Uint8Array.from(vector.bits, Number);
+    const groupStarts = Uint8Array.from(vector.group_starts, Number);
+    const got = String.fromCharCode(...context.realignBits(bits, groupStarts));
+    if (got !== vector.expected) {
+        failures++;
+        console.log(`FAIL ${vector.name}: expected ${JSON.stringify(vector.expected)}, got ${JSON.stringify(got)}`);
+    }
+}
+console.log(`${vectors.length - failures}/${vectors.length} realignment vectors passed`);
+process.exit(failures ? 1 : 0);
@@ -1,9 +1,15 @@
 const QRCode = require('qrcode');
 const fs = require('fs');
+const path = require('path');
 
 // Deployed application URL
 const websiteUrl = 'https://wfic-util-01.clemson.edu/decoder/';
 
+// Usage: node generate-qr.js [outDir] [pngWidth...]
+// Extra widths write qr-code.<width>.png alongside the default 300px files (used by build.py)
+const outDir = process.argv[2] || '.';
+const extraWidths = process.argv.slice(3).map(Number).filter(Boolean);
+
 async function generateQRCode() {
     try {
         // Generate QR code as SVG
@@ -18,7 +24,8 @@ async function generateQRCode() {
         }); 
         
         // Generate QR code as PNG
-        await QRCode.toFile('qr-code.png', websiteUrl, {
+        fs.mkdirSync(outDir, { recursive: true });
+        await QRCode.toFile(path.join(outDir, 'qr-code.png'), websiteUrl, {
             width: 300,
             margin: 2,
             color: {
@@ -27,15 +34,27 @@ async function generateQRCode() {
             }
         });
         
+        for (const width of extraWidths) {
+            await QRCode.toFile(path.join(outDir, `qr-code.${width}.png`), websiteUrl, {
+                width: width,
+                margin: 2,
+                color: {
+                    dark: '#000000ff',
+                    light: '#FFFFFF'
+                }
+            });
+        }
+        
         // Save SVG version
-        fs.writeFileSync('qr-code.svg', qrSvg);
+        fs.writeFileSync(path.join(outDir, 'qr-code.svg'), qrSvg);
         
         console.log('QR codes generated successfully!');
         console.log('Website URL:', websiteUrl);
-        console.log('Files created: qr-code.png, qr-code.svg');
+        console.log('Files created: qr-code.png, qr-code.svg' + extraWidths.map(w => `, qr-code.${w}.png`).join(''));
         
     } catch (error) {
         console.error('Error generating QR code:', error);
+        process.exit(1);
     }
 }
 
@@ -0,0 +1,254 @@
+import io
+import os
+import re
+import ssl
+import gzip
+import hashlib
+import argparse
+import mimetypes
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+PORT = 8000
+
+# Types worth compressing; images and fonts are already compressed
+COMPRESSIBLE = {".html", ".js", ".css", ".svg", ".json", ".txt", ".traineddata", ".md"}
+
+# Folders skipped when precompressing at startup (still served, compressed on first request)
+SKIP_DIRS = {".git", "node_modules", "__pycache__", "tesseract-training", "unused", "training"}
+
+# Never served: TLS keys and repository internals
+DENY = re.compile(r"(^|/)(\.git(/|$)|[^/]*\.pem$|[^/]*\.key$)")
+
+# Names with a content hash (e.g. style.3f2a9c1b.css) never change, so can be cached for good
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.[a-z0-9]+$")
+CACHE_HASHED = "public, max-age=31536000, immutable"
+# Everything else (HTML, and JS/CSS edited in place) is revalidated with its ETag on every use
+CACHE_UNHASHED = "no-cache"
+
+# Memory for cached assets, counting their compressed copies; least recently used ones are dropped first
+MAX_CACHE_BYTES = 64 * 2**20
+
+
+class Asset:
+    """One file's contents, precompressed variants and validators"""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.mtime = stat.st_mtime_ns
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.etag = hashlib.sha256(self.data).hexdigest()[:32]
+        self.encoded = {}
+        if os.path.splitext(path)[1].lower() in COMPRESSIBLE and len(self.data) > 256:
+            self.encoded["gzip"] = gzip.compress(self.data, 9, mtime=0)
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(self.data, quality=11)
+        self.size = len(self.data) + sum(len(body) for body in self.encoded.values())
+
+
+_assets = OrderedDict()
+_assets_bytes = 0
+_assets_lock = threading.Lock()
+
+
+def load_asset(path):
+    """Cached Asset for path, rebuilt when the file changes on disk
+
+    The cache holds at most MAX_CACHE_BYTES; an asset bigger than that on
+    its own is built for the request and not kept.
+    """
+    global _assets_bytes
+    mtime = os.stat(path).st_mtime_ns
+    with _assets_lock:
+        asset = _assets.get(path)
+        if asset is not None and asset.mtime == mtime:
+            _assets.move_to_end(path)
+            return asset
+    asset = Asset(path)
+    if asset.size > MAX_CACHE_BYTES:
+        return asset
+    with _assets_lock:
+        old = _assets.pop(path, None)
+        if old is not None:
+            _assets_bytes -= old.size
+        _assets[path] = asset
+        _assets_bytes += asset.size
+        while _assets_bytes > MAX_CACHE_BYTES:
+            _, dropped = _assets.popitem(last=False)
+            _assets_bytes -= dropped.size
+    return asset
+
+
+def precompress(root):
+    """Load and compress every servable asset under root up front, as far as the cache holds; return how many"""
+    count = 0
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            path = os.path.join(folder, name)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE and not DENY.search(path.replace(os.sep, "/")):
+                load_asset(path)
+                count += 1
+    return count
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single "bytes=" range; None to send everything; False if unsatisfiable"""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # Malformed or multi-range: RFC 9110 allows ignoring it
+    if match.group(1) == "":
+        length = int(match.group(2))
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(match.group(1))
+    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+class CachingHandler(SimpleHTTPRequestHandler):
+    """Static files with precompression, strong ETags, Cache-Control, conditional GET and ranges"""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        if DENY.search(relative):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return super().send_head()  # Redirects to the slash form
+            if not os.path.isfile(index):
+                return super().send_head()  # Directory listing
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+
+        asset = load_asset(path)
+        encoding = self.choose_encoding(asset)
+        body = asset.encoded[encoding] if encoding else asset.data
+        # A strong ETag identifies exact bytes, so each encoding gets its own
+        etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+
+        if self.not_modified(asset, etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(path, asset, etag, encoding)
+            self.end_headers()
+            return None
+
+        status, start, end = HTTPStatus.OK, 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.range_applies(etag, asset):
+            # Ranges are served from the uncompressed bytes so offsets mean what the client expects
+            body, etag, encoding = asset.data, f'"{asset.etag}"', None
+            byte_range = parse_range(range_header, len(body))
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            if byte_range:
+                status, (start, end) = HTTPStatus.PARTIAL_CONTENT, byte_range
+
+        self.send_response(status)
+        self.send_validators(path, asset, etag, encoding)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return io.BytesIO(body[start:end + 1])
+
+    def choose_encoding(self, asset):
+        accepted = {
+            part.split(";")[0].strip().lower()
+            for part in self.headers.get("Accept-Encoding", "").split(",")
+            if not part.replace(" ", "").endswith(";q=0")
+        }
+        for encoding in ("br", "gzip"):
+            if encoding in asset.encoded and encoding in accepted:
+                return encoding
+        return None
+
+    def not_modified(self, asset, etag):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= asset.mtime // 10**9
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def range_applies(self, etag, asset):
+        """If-Range: only honour the range if the client's copy is still current"""
+        if_range = self.headers.get("If-Range")
+        return if_range is None or if_range in (etag, f'"{asset.etag}"', asset.last_modified)
+
+    def send_validators(self, path, asset, etag, encoding):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("Cache-Control", self.cache_control(path))
+        if asset.encoded:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+
+    def cache_control(self, path):
+        if HASHED_NAME.search(os.path.basename(path)):
+            return CACHE_HASHED
+        return CACHE_UNHASHED
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the site with compression, caching headers and range requests")
+    parser.add_argument('--port', type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument('--bind', default="", help="Address to listen on (default: all interfaces)")
+    parser.add_argument('--directory', default=os.path.dirname(os.path.abspath(__file__)), help="Folder to serve")
+    parser.add_argument('--tls', action='store_true',
+                        help="Serve HTTPS with cert.pem/key.pem, which phones need for camera access")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    mimetypes.add_type("application/octet-stream", ".traineddata")
+    mimetypes.add_type("image/webp", ".webp")
+    count = precompress(args.directory)
+    print(f"Precompressed {count} assets ({'gzip + brotli' if brotli else 'gzip'})")
+
+    handler = lambda *a, **kw: CachingHandler(*a, directory=args.directory, **kw)
+    server = ThreadingHTTPServer((args.bind, args.port), handler)
+    scheme = "http"
+    if args.tls:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(args.directory, "cert.pem"), os.path.join(args.directory, "key.pem"))
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    print(f"Serving {args.directory} on {scheme}://localhost:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
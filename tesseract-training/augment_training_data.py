@@ -0,0 +1,256 @@
+import os
+import re
+import glob
+import shutil
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from generate_training_data import OUTPUT_DIR
+
+AUGMENTED_DIR = "training_images_augmented"
+
+# Augmented copies written per source image, and source images augmented together as one stack
+COPIES = 4
+CHUNK_SIZE = 32
+
+# Per-image strengths, drawn uniformly from these ranges
+ROTATION_DEGREES = 3.0
+SHEAR = 0.15
+PERSPECTIVE = 0.03            # Relative scale change from one edge of the image to its centre
+BLUR_SIGMAS = (0.0, 0.0, 0.6, 1.0, 1.6)
+CONTRAST = (0.55, 1.0)
+BRIGHTNESS = (-0.08, 0.12)
+GLARE = (0.0, 0.45)
+NOISE = (0.0, 0.06)
+JPEG_QUALITY = (20, 90)
+
+# Rendered text has a 20px margin; rotation is limited so wide lines keep most of it
+MARGIN = 15
+
+# Standard JPEG luminance quantisation table (quality 50)
+_JPEG_TABLE = np.array([
+    [16, 11, 10, 16, 24, 40, 51, 61],
+    [12, 12, 14, 19, 26, 58, 60, 55],
+    [14, 13, 16, 24, 40, 57, 69, 56],
+    [14, 17, 22, 29, 51, 87, 80, 62],
+    [18, 22, 37, 56, 68, 109, 103, 77],
+    [24, 35, 55, 64, 81, 104, 113, 92],
+    [49, 64, 78, 87, 103, 121, 120, 101],
+    [72, 92, 95, 98, 112, 100, 103, 99],
+], dtype=np.float32)
+
+# Orthonormal 8-point DCT-II matrix
+_DCT = np.array([
+    [np.sqrt((1 if k == 0 else 2) / 8) * np.cos((2 * n + 1) * k * np.pi / 16) for n in range(8)]
+    for k in range(8)
+], dtype=np.float32)
+
+
+def augmented_name(filename, copy):
+    """gillsans.font.exp3.24.tif -> gillsans.font.exp3a1.24.tif, keeping the exp index readable"""
+    return re.sub(r"\.exp(\d+)\.", rf".exp\1a{copy}.", os.path.basename(filename), count=1)
+
+
+def load_stack(paths):
+    """Grayscale images as one (N, H, W) float32 stack in [0, 1], padded with white to multiples of 8
+
+    Returns the stack and each image's original (height, width).
+    """
+    images = [np.asarray(Image.open(p).convert("L"), dtype=np.float32) / 255 for p in paths]
+    shapes = [img.shape for img in images]
+    height = -(-max(h for h, _ in shapes) // 8) * 8
+    width = -(-max(w for _, w in shapes) // 8) * 8
+    stack = np.ones((len(images), height, width), dtype=np.float32)
+    for i, img in enumerate(images):
+        stack[i, :img.shape[0], :img.shape[1]] = img
+    return stack, shapes
+
+
+def random_homographies(rng, shapes):
+    """One 3x3 output->source matrix per image: rotation, shear and perspective about its centre"""
+    n = len(shapes)
+    centres = np.array([(w / 2, h / 2) for h, w in shapes], dtype=np.float64)
+    max_angles = np.minimum(np.radians(ROTATION_DEGREES), np.arctan(MARGIN / centres[:, 0]))
+    angles = rng.uniform(-1, 1, n) * max_angles
+    shears = rng.uniform(-SHEAR, SHEAR, n)
+    px, py = rng.uniform(-PERSPECTIVE, PERSPECTIVE, (2, n)) / centres.T
+
+    matrices = np.zeros((n, 3, 3))
+    cos, sin = np.cos(angles), np.sin(angles)
+    matrices[:, 0, 0] = cos
+    matrices[:, 0, 1] = -sin + shears
+    matrices[:, 1, 0] = sin
+    matrices[:, 1, 1] = cos
+    matrices[:, 2, 0] = px
+    matrices[:, 2, 1] = py
+    matrices[:, 2, 2] = 1
+
+    to_centre = np.tile(np.eye(3), (n, 1, 1))
+    to_centre[:, :2, 2] = -centres
+    back = np.tile(np.eye(3), (n, 1, 1))
+    back[:, :2, 2] = centres
+    return back @ matrices @ to_centre
+
+
+def warp(stack, matrices):
+    """Resample every image through its homography with bilinear interpolation; outside is white"""
+    n, height, width = stack.shape
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    grid = np.stack([xs.ravel(), ys.ravel(), np.ones(xs.size, dtype=np.float32)])
+    src = np.einsum("nij,jk->nik", matrices.astype(np.float32), grid)
+    sx = src[:, 0] / src[:, 2]
+    sy = src[:, 1] / src[:, 2]
+
+    x0 = np.floor(sx).astype(np.int64)
+    y0 = np.floor(sy).astype(np.int64)
+    fx = sx - x0
+    fy = sy - y0
+    flat = stack.reshape(n, -1)
+    rows = np.arange(n)[:, None]
+
+    def sample(x, y):
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        index = np.clip(y, 0, height - 1) * width + np.clip(x, 0, width - 1)
+        return np.where(inside, flat[rows, index], 1.0)
+
+    top = sample(x0, y0) * (1 - fx) + sample(x0 + 1, y0) * fx
+    bottom = sample(x0, y0 + 1) * (1 - fx) + sample(x0 + 1, y0 + 1) * fx
+    return (top * (1 - fy) + bottom * fy).reshape(n, height, width).astype(np.float32)
+
+
+def gaussian_blur(stack, sigmas):
+    """Separable Gaussian blur; images sharing a sigma are blurred together"""
+    out = stack.copy()
+    for sigma in np.unique(sigmas):
+        if sigma <= 0:
+            continue
+        idx = np.flatnonzero(sigmas == sigma)
+        radius = int(np.ceil(3 * sigma))
+        kernel = np.exp(-np.arange(-radius, radius + 1) ** 2 / (2 * sigma ** 2)).astype(np.float32)
+        kernel /= kernel.sum()
+        subset = stack[idx]
+        for axis in (1, 2):
+            padding = [(0, 0)] * 3
+            padding[axis] = (radius, radius)
+            padded = np.pad(subset, padding, mode="edge")
+            size = subset.shape[axis]
+            subset = sum(w * np.take(padded, np.arange(k, k + size), axis=axis) for k, w in enumerate(kernel))
+        out[idx] = subset
+    return out
+
+
+def add_glare(stack, rng):
+    """Brighten a soft radial spot per image, like a reflection off the wall"""
+    n, height, width = stack.shape
+    strength = rng.uniform(*GLARE, n)[:, None, None]
+    cx = rng.uniform(0, width, n)[:, None, None]
+    cy = rng.uniform(0, height, n)[:, None, None]
+    radius = rng.uniform(0.2, 0.6, n)[:, None, None] * max(height, width)
+    ys, xs = np.ogrid[0:height, 0:width]
+    spot = np.exp(-((xs - cx) ** 2 + (ys - cy) ** 2) / (2 * radius ** 2))
+    return stack + strength * spot * (1 - stack)
+
+
+def jpeg_artifacts(stack, qualities):
+    """Quantise each 8x8 block's DCT like a JPEG encoder at the given per-image quality"""
+    n, height, width = stack.shape
+    scale = np.where(qualities < 50, 5000 / qualities, 200 - 2 * qualities)
+    tables = np.maximum(np.floor((_JPEG_TABLE * scale[:, None, None] + 50) / 100), 1).astype(np.float32)
+
+    blocks = (stack * 255 - 128).reshape(n, height // 8, 8, width // 8, 8).transpose(0, 1, 3, 2, 4)
+    coefficients = _DCT @ blocks @ _DCT.T
+    tables = tables[:, None, None]
+    quantised = np.round(coefficients / tables) * tables
+    restored = _DCT.T @ quantised @ _DCT
+    return ((restored.transpose(0, 1, 3, 2, 4).reshape(n, height, width) + 128) / 255).astype(np.float32)
+
+
+def augment_stack(stack, shapes, rng):
+    """Apply geometry, blur, glare, contrast, noise and compression to a whole stack at once"""
+    n = len(stack)
+    stack = warp(stack, random_homographies(rng, shapes))
+    stack = gaussian_blur(stack, rng.choice(BLUR_SIGMAS, n))
+    stack = add_glare(stack, rng)
+    contrast = rng.uniform(*CONTRAST, n)[:, None, None]
+    brightness = rng.uniform(*BRIGHTNESS, n)[:, None, None]
+    stack = 0.5 + (stack - 0.5) * contrast + brightness
+    stack = stack + rng.normal(size=stack.shape).astype(np.float32) * rng.uniform(*NOISE, n)[:, None, None]
+    stack = np.clip(stack, 0, 1)
+    return np.clip(jpeg_artifacts(stack, rng.integers(*JPEG_QUALITY, n, endpoint=True)), 0, 1)
+
+
+def augment_chunk(job):
+    """Write every augmented copy of one stack of images; runs in a worker process"""
+    paths, copies, seed, output_dir = job
+    try:
+        stack, shapes = load_stack(paths)
+        rng = np.random.default_rng(seed)
+        written = 0
+        for copy in range(1, copies + 1):
+            augmented = (augment_stack(stack, shapes, rng) * 255 + 0.5).astype(np.uint8)
+            for path, (height, width), img in zip(paths, shapes, augmented):
+                Image.fromarray(img[:height, :width]).save(os.path.join(output_dir, augmented_name(path, copy)))
+                written += 1
+        return written, None
+    except Exception as e:
+        return 0, f"{os.path.basename(paths[0])}...: {e}"
+
+
+def augment_training_images(input_dir=OUTPUT_DIR, output_dir=AUGMENTED_DIR, copies=COPIES, seed=0, jobs=None,
+                            chunk_size=CHUNK_SIZE, include_originals=False):
+    """Write `copies` augmented versions of every rendered training image
+
+    Images of similar size are stacked so each augmentation runs once per
+    stack instead of once per image. Each stack gets its own child of the
+    seed, so output doesn't depend on the number of workers.
+    """
+    # Multi-page batch TIFFs come with rendered .box files that augmentation would invalidate
+    paths = [p for p in sorted(glob.glob(os.path.join(input_dir, "*.tif"))) if not p.endswith(".batch.tif")]
+    if not paths:
+        print(f"No training images found in {input_dir}. Run generate_training_data.py first.")
+        return 0
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Similar sizes together keeps the white padding in each stack small
+    sizes = {}
+    for path in paths:
+        with Image.open(path) as img:
+            sizes[path] = (img.height, img.width)
+    paths.sort(key=lambda p: sizes[p])
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    print(f"Augmenting {len(paths)} images x {copies} copies in {len(chunks)} stacks")
+    written = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for count, error in executor.map(augment_chunk, [(c, copies, s, output_dir) for c, s in zip(chunks, seeds)]):
+            if error:
+                print(f"Error augmenting {error}")
+            written += count
+
+    if include_originals:
+        for path in paths:
+            shutil.copy2(path, output_dir)
+    print(f"Wrote {written} augmented images to {output_dir}")
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Add blur, perspective, glare, noise and JPEG artifacts to training images")
+    parser.add_argument('--input-dir', default=OUTPUT_DIR, help=f"Rendered images (default: {OUTPUT_DIR})")
+    parser.add_argument('--output-dir', default=AUGMENTED_DIR, help=f"Output folder (default: {AUGMENTED_DIR})")
+    parser.add_argument('--copies', type=int, default=COPIES, help=f"Augmented copies per image (default: {COPIES})")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same images")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f"Images augmented together as one array (default: {CHUNK_SIZE})")
+    parser.add_argument('--include-originals', action='store_true',
+                        help="Also copy the clean images, so the output folder is a complete training set")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    augment_training_images(args.input_dir, args.output_dir, args.copies, args.seed, args.jobs, args.chunk_size,
+                            args.include_originals)
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from PIL import Image
+from ocr_pipe import TESSDATA_DIR, ocr_files
+from ocr_decode import decode_ocr_text
+from preprocess import preprocess_image
+
+LANG = "gillsans"
+PSM = 6
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp", ".pnm", ".pgm", ".ppm"}
+
+# Images per tesseract process, and batches queued per worker so the walk stays ahead of the pool
+BATCH_SIZE = 8
+QUEUED_PER_WORKER = 2
+
+# Completed records between fsyncs of the output, and between progress lines
+SYNC_EVERY = 100
+PROGRESS_EVERY = 500
+
+
+def walk_images(root):
+    """Image paths under root, depth first in name order, listing one folder at a time"""
+    folders = [root]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            print(f"Skipping {folder}: {e}")
+            continue
+        subfolders = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                yield entry.path
+        folders.extend(reversed(subfolders))
+
+
+def iter_images(sources, list_file=None):
+    """Lazily yield every image named by sources (files or folders) and list_file ("-" for stdin)"""
+    for source in sources:
+        if os.path.isdir(source):
+            yield from walk_images(source)
+        else:
+            yield source
+    if list_file:
+        f = sys.stdin if list_file == "-" else open(list_file, encoding="utf-8")
+        with f:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_done(output_path):
+    """Paths already decoded successfully in output_path
+
+    Paths whose records have an error aren't included, so a rerun tries them
+    again and appends a new record. A record cut off by an interrupted run
+    is dropped from the end of the file, so the output stays one valid JSON
+    object per line.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    good = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                path = record["path"]
+            except (ValueError, KeyError):
+                break
+            if "error" not in record:
+                done.add(path)
+            if not line.endswith(b"\n"):
+                break
+            good += len(line)
+    if good < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(good)
+    return done
+
+
+def decode_batch(job):
+    """OCR and decode a batch of images with one tesseract process; runs in a worker process"""
+    paths, lang, tessdata_dir, psm, preprocess = job
+    records = {path: {"path": path} for path in paths}
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = {}
+        for i, path in enumerate(paths):
+            start = time.perf_counter()
+            try:
+                # Opening reads the header, so unreadable files are caught before they upset a whole batch
+                with Image.open(path) as img:
+                    if preprocess:
+                        inputs[path] = os.path.join(tmp, f"{i}.png")
+                        preprocess_image(img, preprocess).save(inputs[path])
+                    else:
+                        inputs[path] = path
+            except Exception as e:
+                records[path]["error"] = str(e)
+            if preprocess:
+                records[path]["preprocess_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        try:
+            texts = ocr_files(list(inputs.values()), lang=lang, tessdata_dir=tessdata_dir, psm=psm) if inputs else []
+            error = None
+        except (RuntimeError, OSError) as e:
+            texts, error = [None] * len(inputs), str(e)
+        # One process reads the whole batch, so each image is charged an equal share
+        ocr_ms = round((time.perf_counter() - start) * 1000 / max(len(inputs), 1), 1)
+
+    for path, text in zip(inputs, texts):
+        record = records[path]
+        record["ocr_ms"] = ocr_ms
+        if error:
+            record["error"] = error
+            continue
+        start = time.perf_counter()
+        record["text"] = text
+        record["decoded"] = decode_ocr_text(text)
+        record["decode_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return [records[path] for path in paths]
+
+
+def batch_decode(sources, output_path, list_file=None, lang=LANG, tessdata_dir=TESSDATA_DIR, psm=PSM, jobs=None,
+                 batch_size=BATCH_SIZE, preprocess=None):
+    """OCR and decode every image, appending one JSON record per image to output_path
+
+    Images are found lazily and only a few batches per worker are queued at
+    once, so memory doesn't grow with the number of images. The output is
+    the checkpoint: images it already records are skipped, so rerunning the
+    same command after an interruption picks up where it stopped. Records
+    are written in completion order.
+    """
+    done = load_done(output_path)
+    if done:
+        print(f"Resuming: {len(done)} images already in {output_path}")
+    jobs = jobs or os.cpu_count() or 1
+    todo = (path for path in iter_images(sources, list_file) if path not in done)
+    written = failed = 0
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=jobs) as executor:
+        def write(finished):
+            nonlocal written, failed
+            for future in finished:
+                for record in future.result():
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    written += 1
+                    failed += "error" in record
+                    if written % SYNC_EVERY == 0:
+                        out.flush()
+                        os.fsync(out.fileno())
+                    if written % PROGRESS_EVERY == 0:
+                        print(f"{written} images, {written / (time.perf_counter() - start):.1f}/s, {failed} failed")
+
+        pending = set()
+        try:
+            for batch in batched(todo, batch_size):
+                pending.add(executor.submit(decode_batch, (batch, lang, tessdata_dir, psm, preprocess)))
+                if len(pending) >= jobs * QUEUED_PER_WORKER:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    write(finished)
+            write(wait(pending).done)
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            write(f for f in pending if f.done() and not f.cancelled())
+            out.flush()
+            print(f"\nInterrupted after {written} images; run the same command again to resume")
+            raise
+
+    elapsed = time.perf_counter() - start
+    print(f"Decoded {written} images in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.1f}/s, "
+          f"{failed} failed); records in {output_path}")
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OCR and decode a folder or list of binary-wall photos to JSONL")
+    parser.add_argument('sources', nargs='*', help="Image files and folders (searched recursively)")
+    parser.add_argument('--list', dest='list_file', help="File with one image path per line, or - for stdin")
+    parser.add_argument('--output', default="decoded.jsonl", help="JSONL output, also used to resume (default: decoded.jsonl)")
+    parser.add_argument('--lang', default=LANG, help=f"Model to use (default: {LANG})")
+    parser.add_argument('--tessdata-dir', default=TESSDATA_DIR, help=f"Folder with the model (default: {TESSDATA_DIR})")
+    parser.add_argument('--psm', type=int, default=PSM, help=f"Tesseract page segmentation mode (default: {PSM})")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"Images per tesseract process (default: {BATCH_SIZE})")
+    parser.add_argument('--preprocess', choices=["sauvola", "otsu"],
+                        help="Binarize, denoise, deskew and crop each image before OCR")
+    args = parser.parse_args()
+    if not args.sources and not args.list_file:
+        parser.error("give at least one image or folder, or --list")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        batch_decode(args.sources, args.output, args.list_file, args.lang, args.tessdata_dir, args.psm, args.jobs,
+                     args.batch_size, args.preprocess)
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+from build_cache import hash_file, tesseract_version
+from generate_training_data import TRAINING_TEXTS, find_font_files, load_font, render_text_image
+from ocr_pipe import ocr_image
+from test_model import EVAL_MODELS, RESULTS_DIR, character_accuracy, percentile
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS isn't reported
+    resource = None
+
+BASELINE_PATH = "benchmark_baseline.json"
+
+# Synthetic binary-wall pages: groups per line, lines per page, and upscale factors.
+# The 2x scale mirrors runOcrOnCanvas() in binary-decoder.js.
+WALL_GROUPS = 6
+WALL_LINES = 8
+WALL_FONT_SIZE = 20
+WALL_SCALES = (1, 2)
+WALL_PAGES = 3
+
+# Allowed change before a metric counts as a regression: relative for speed and memory,
+# absolute for accuracy (0.02 = two percentage points)
+SPEED_THRESHOLD = 0.20
+ACCURACY_THRESHOLD = 0.02
+
+# Metrics compared with the baseline: (name, True when higher is better)
+METRICS = [
+    ("load_seconds", False),
+    ("latency_p50", False),
+    ("latency_p95", False),
+    ("chars_per_second", True),
+    ("peak_rss_mb", False),
+    ("accuracy", True),
+]
+
+
+def binary_wall_text(rng, groups=WALL_GROUPS, lines=WALL_LINES):
+    """Random 8-bit groups laid out like the binary wall"""
+    return "\n".join(
+        " ".join(format(rng.randrange(32, 127), "08b") for _ in range(groups))
+        for _ in range(lines)
+    )
+
+
+def render_wall_page(font_path, text, size=WALL_FONT_SIZE, scale=1):
+    """Render a multi-line binary page, then upscale it the way the web app does"""
+    font = load_font(font_path, size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new('RGB', (1, 1))).multiline_textbbox((0, 0), text, font=font)
+    img = Image.new('RGB', (right - left + 40, bottom - top + 40), 'white')
+    ImageDraw.Draw(img).multiline_text((20 - left, 20 - top), text, font=font, fill='black')
+    if scale != 1:
+        img = img.resize((img.width * scale, img.height * scale), Image.BICUBIC)
+    return img
+
+
+def build_corpus(font_files=None, sizes=(16, 24, 32), pages=WALL_PAGES, seed=0):
+    """[(label, image, expected text)]: the rendered training texts plus synthetic wall pages"""
+    font_files = font_files or find_font_files()
+    rng = random.Random(seed)
+    walls = [binary_wall_text(rng) for _ in range(pages)]
+    corpus = []
+    for font_path in font_files:
+        name = os.path.splitext(os.path.basename(font_path))[0]
+        for size in sizes:
+            for index, text in enumerate(TRAINING_TEXTS):
+                corpus.append((f"{name} {size}px text{index}", render_text_image(font_path, text, size), text))
+        for scale in WALL_SCALES:
+            for index, text in enumerate(walls):
+                corpus.append((f"{name} wall{index} x{scale}", render_wall_page(font_path, text, scale=scale), text))
+    return corpus
+
+
+def peak_child_rss_mb():
+    """Largest resident set of any finished child process of this one, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_load_time(lang, tessdata_dir, repeats=3):
+    """Median time for tesseract to start, load the model and read a blank page"""
+    blank = Image.new('RGB', (64, 32), 'white')
+    loads = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ocr_image(blank, lang=lang, tessdata_dir=tessdata_dir)
+        loads.append(time.perf_counter() - start)
+    return percentile(loads, 50)
+
+
+def benchmark_model(lang, tessdata_dir, corpus, repeats=3):
+    """Time one model over the corpus; runs in a fresh worker process so peak RSS is its own
+
+    Every tesseract call loads the model, so load time is measured on a
+    blank page and subtracted from each page's latency.
+    """
+    load_seconds = measure_load_time(lang, tessdata_dir, repeats)
+
+    pages = []
+    for label, img, expected in corpus:
+        start = time.perf_counter()
+        text = ocr_image(img, lang=lang, tessdata_dir=tessdata_dir)
+        latency = max(time.perf_counter() - start - load_seconds, 0.0)
+        pages.append({
+            "page": label,
+            "latency": latency,
+            "chars": len(expected),
+            "accuracy": character_accuracy(expected, text),
+        })
+
+    latencies = [p["latency"] for p in pages]
+    recognise_time = sum(latencies)
+    return {
+        "load_seconds": load_seconds,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "chars_per_second": sum(p["chars"] for p in pages) / recognise_time if recognise_time else 0.0,
+        "peak_rss_mb": peak_child_rss_mb(),
+        "accuracy": sum(p["accuracy"] for p in pages) / len(pages) if pages else None,
+        "pages": pages,
+    }
+
+
+def model_file(lang, tessdata_dir):
+    path = os.path.join(tessdata_dir, f"{lang}.traineddata") if tessdata_dir else None
+    return path if path and os.path.exists(path) else None
+
+
+def run_benchmarks(models=EVAL_MODELS, font_files=None, repeats=3):
+    """Benchmark every model in turn, each in its own worker process"""
+    corpus = build_corpus(font_files)
+    print(f"Benchmarking {len(models)} model(s) on {len(corpus)} pages")
+    results = {"tesseract": tesseract_version(), "pages": len(corpus), "models": {}}
+    for lang, tessdata_dir in models:
+        # A new single-worker pool per model, so RUSAGE_CHILDREN only sees this model's tesseract runs
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                stats = executor.submit(benchmark_model, lang, tessdata_dir, corpus, repeats).result()
+            except (RuntimeError, OSError) as e:
+                print(f"{lang}: benchmark failed: {e}")
+                continue
+        path = model_file(lang, tessdata_dir)
+        stats["model"] = path
+        stats["model_sha256"] = hash_file(path) if path else None
+        results["models"][lang] = stats
+        rss = f"{stats['peak_rss_mb']:.0f} MB" if stats['peak_rss_mb'] is not None else "n/a"
+        print(f"{lang:10} load {stats['load_seconds'] * 1000:7.1f} ms  p50 {stats['latency_p50'] * 1000:7.1f} ms  "
+              f"p95 {stats['latency_p95'] * 1000:7.1f} ms  {stats['chars_per_second']:8.1f} chars/s  "
+              f"RSS {rss}  accuracy {stats['accuracy']:.2%}")
+    return results
+
+
+def compare_to_baseline(results, baseline, speed_threshold=SPEED_THRESHOLD, accuracy_threshold=ACCURACY_THRESHOLD):
+    """List of regression messages; empty when every metric is within its threshold"""
+    regressions = []
+    for lang, stats in results["models"].items():
+        base = baseline.get("models", {}).get(lang)
+        if base is None:
+            print(f"{lang}: no baseline, skipping comparison")
+            continue
+        for metric, higher_is_better in METRICS:
+            old, new = base.get(metric), stats.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == "accuracy":
+                worse = old - new > accuracy_threshold
+            elif higher_is_better:
+                worse = new < old * (1 - speed_threshold)
+            else:
+                worse = new > old * (1 + speed_threshold)
+            if worse:
+                regressions.append(f"{lang} {metric}: {old:.4g} -> {new:.4g}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark OCR speed and accuracy of the trained model against eng")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, "benchmark.json"), help="Results JSON")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help=f"Baseline JSON (default: {BASELINE_PATH})")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--fonts', nargs='+', help="Fonts to render (default: every training font)")
+    parser.add_argument('--repeats', type=int, default=3, help="Blank-page runs used to measure model load time")
+    parser.add_argument('--speed-threshold', type=float, default=SPEED_THRESHOLD,
+                        help=f"Allowed relative slowdown or memory growth (default: {SPEED_THRESHOLD})")
+    parser.add_argument('--accuracy-threshold', type=float, default=ACCURACY_THRESHOLD,
+                        help=f"Allowed absolute accuracy drop (default: {ACCURACY_THRESHOLD})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(font_files=args.fonts, repeats=args.repeats)
+    if not results["models"]:
+        print("No model could be benchmarked.")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"Baseline updated: {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        sys.exit(0)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.speed_threshold, args.accuracy_threshold)
+    if regressions:
+        print("REGRESSIONS against baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print("No regressions against baseline.")
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+from font_inventory import tool_version
+
+# File digests already computed by this process, keyed by (path, mtime_ns, size)
+_file_digests = {}
+_tesseract_version = None
+
+
+def hash_file(path):
+    """SHA-256 of a file's contents"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    digest = _file_digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _file_digests[key] = digest
+    return digest
+
+
+def hash_inputs(*parts):
+    """SHA-256 over any JSON-serialisable description of a step's inputs"""
+    data = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def tesseract_version():
+    """First line of `tesseract --version`, or 'unknown' if it can't be run"""
+    global _tesseract_version
+    if _tesseract_version is None:
+        _tesseract_version = tool_version("tesseract") or "unknown"
+    return _tesseract_version
+
+
+class BuildManifest:
+    """Input digests of a stage's outputs, stored as JSON next to those outputs
+
+    Each entry maps a key (usually an output file) to the digest of the inputs
+    that produced it and the output files it wrote. An entry is fresh when the
+    digest matches and every output still exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable build manifest {path}: {e}")
+
+    def is_fresh(self, key, digest):
+        entry = self.entries.get(key)
+        if not entry or entry.get("inputs") != digest:
+            return False
+        return all(os.path.exists(p) for p in entry.get("outputs", []))
+
+    def record(self, key, digest, outputs):
+        self.entries[key] = {"inputs": digest, "outputs": list(outputs)}
+
+    def forget(self, key):
+        self.entries.pop(key, None)
+
+    def prune(self, keys):
+        """Forget every entry whose key isn't in keys; return the output files those entries listed"""
+        outputs = []
+        for key in [k for k in self.entries if k not in keys]:
+            outputs += self.entries.pop(key).get("outputs", [])
+        return outputs
+
+    def save(self):
+        """Write the manifest atomically so an interrupted run can't corrupt it"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
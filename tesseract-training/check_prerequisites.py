@@ -1,17 +1,12 @@
-import subprocess
-import sys
-import os
-import glob
+from font_inventory import TRAINING_PATHS, describe_font, find_training_fonts, probe_tools
 
-def check_command(command, description):
-    """Check if a command exists and is working"""
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, shell=True)
-        print(f"✓ {description}: Available")
+def check_tool(tool, description):
+    """Report one tool from the probe_tools() results"""
+    if tool["available"]:
+        print(f"✓ {description}: {tool['version']}")
         return True
-    except Exception:
-        print(f"✗ {description}: Not found or not working")
-        return False
+    print(f"✗ {description}: Not found or not working")
+    return False
 
 def check_python_packages():
     """Check required Python packages"""
@@ -30,27 +25,18 @@ def check_python_packages():
 
 def check_font_files():
     """Check for OTF font files in training folder"""
-    # Look in the training folder one level up
-    training_paths = ["training", "../training"]
-    
-    for training_path in training_paths:
-        if os.path.exists(training_path):
-            try:
-                all_files = os.listdir(training_path)
-                otf_files = [f for f in all_files if f.lower().endswith('.otf')]
-                
-                if otf_files:
-                    print(f"✓ Font files found: {len(otf_files)} OTF files in {os.path.abspath(training_path)}")
-                    for font in otf_files[:5]:  # Show first 5 to avoid spam
-                        print(f"  - {font}")
-                    if len(otf_files) > 5:
-                        print(f"  ... and {len(otf_files) - 5} more files")
-                    return True
-            except Exception as e:
-                print(f"Error reading {training_path}: {e}")
+    scan = find_training_fonts()
+    if scan:
+        fonts = scan["fonts"]
+        print(f"✓ Font files found: {len(fonts)} OTF files in {scan['path']}")
+        for font in fonts[:5]:  # Show first 5 to avoid spam
+            print(f"  - {font['name']}: {describe_font(font)}")
+        if len(fonts) > 5:
+            print(f"  ... and {len(fonts) - 5} more files")
+        return True
     
     print("✗ No OTF font files found in training folder")
-    print("  Checked paths: training, ../training")
+    print(f"  Checked paths: {', '.join(TRAINING_PATHS)}")
     return False
 
 def main():
@@ -60,21 +46,17 @@ def main():
     
     all_good = True
     
+    # Every tool is probed at once; unchanged tools are answered from the inventory cache
+    tools = probe_tools()
+    
     # Check Tesseract
-    if not check_command("tesseract --version", "Tesseract OCR"):
+    if not check_tool(tools["tesseract"], "Tesseract OCR"):
         all_good = False
         print("  Install from: https://github.com/UB-Mannheim/tesseract/wiki")
     
     # Check training tools
-    training_tools = [
-        ("unicharset_extractor --version", "unicharset_extractor"),
-        ("mftraining -v", "mftraining"),
-        ("cntraining -v", "cntraining"),
-        ("combine_tessdata -v", "combine_tessdata")
-    ]
-    
-    for cmd, tool in training_tools:
-        if not check_command(cmd, f"Tesseract training tool '{tool}'"):
+    for tool in ["unicharset_extractor", "mftraining", "cntraining", "combine_tessdata"]:
+        if not check_tool(tools[tool], f"Tesseract training tool '{tool}'"):
             all_good = False
     
     # Check Python packages
@@ -1,5 +1,6 @@
 import os
 import sys
+from font_inventory import CACHE_PATH, describe_font, scan_folder
 
 def debug_folder_access():
     """Debug folder access and file detection issues"""
@@ -24,41 +25,17 @@ def debug_folder_access():
         print(f"Can write to training folder: {os.access(training_path, os.W_OK)}")
         print(f"Can execute in training folder: {os.access(training_path, os.X_OK)}")
     
-    # Try different ways to list files
+    # List the folder the way every pipeline script sees it
     print(f"\n=== LISTING FILES IN TRAINING FOLDER ===")
-    
-    try:
-        # Method 1: os.listdir
-        files1 = os.listdir(training_path)
-        print(f"os.listdir() result: {files1}")
-    except Exception as e:
-        print(f"os.listdir() error: {e}")
-    
-    try:
-        # Method 2: os.scandir
-        with os.scandir(training_path) as entries:
-            files2 = [entry.name for entry in entries if entry.is_file()]
-        print(f"os.scandir() files: {files2}")
-    except Exception as e:
-        print(f"os.scandir() error: {e}")
-    
-    try:
-        # Method 3: os.walk
-        for root, dirs, files in os.walk(training_path):
-            print(f"os.walk() - root: {root}, files: {files}")
-            break  # Only check first level
-    except Exception as e:
-        print(f"os.walk() error: {e}")
-    
-    # Check if there are hidden files
-    try:
-        import glob
-        all_files = glob.glob(f"{training_path}/*")
-        hidden_files = glob.glob(f"{training_path}/.*")
-        print(f"glob all files: {all_files}")
-        print(f"glob hidden files: {hidden_files}")
-    except Exception as e:
-        print(f"glob error: {e}")
+    scan = scan_folder(training_path)
+    if scan.get("error"):
+        print(f"os.scandir() error: {scan['error']}")
+    print(f"Font files: {len(scan['fonts'])}")
+    for font in scan["fonts"]:
+        print(f"  - {font['name']} ({font['size']:,} bytes): {describe_font(font)}")
+    print(f"Other files (including hidden): {[name for name, _ in scan['files']]}")
+    print(f"Subfolders: {scan['dirs']}")
+    print(f"Font inventory cache: {CACHE_PATH} (exists: {os.path.exists(CACHE_PATH)})")
     
     print(f"\n=== MANUAL PATH CHECK ===")
     # Check if user can manually navigate
@@ -1,5 +1,5 @@
 import os
-import glob
+from font_inventory import describe_font, scan_folder
 
 def find_font_files():
     """Search for OTF font files in common locations"""
@@ -19,25 +19,26 @@ def find_font_files():
     found_fonts = []
     
     for path in search_paths:
-        if os.path.exists(path):
-            print(f"\nSearching in: {os.path.abspath(path)}")
-            try:
-                # Search for OTF files
-                otf_files = glob.glob(os.path.join(path, "*.otf"))
-                otf_files.extend(glob.glob(os.path.join(path, "*.OTF")))
-                
-                if otf_files:
-                    print(f"  Found {len(otf_files)} OTF files:")
-                    for font in otf_files:
-                        print(f"    - {font}")
-                        if "gill" in font.lower() or "sans" in font.lower():
-                            found_fonts.append(font)
-                else:
-                    print("  No OTF files found")
-            except Exception as e:
-                print(f"  Error searching: {e}")
-        else:
+        scan = scan_folder(path)
+        if not scan["exists"]:
             print(f"Path doesn't exist: {path}")
+            continue
+        print(f"\nSearching in: {scan['path']}")
+        if scan.get("error"):
+            print(f"  Error searching: {scan['error']}")
+            continue
+        
+        otf_files = scan["fonts"]
+        if otf_files:
+            print(f"  Found {len(otf_files)} OTF files:")
+            for font in otf_files:
+                print(f"    - {font['path']}: {describe_font(font)}")
+                # The family name catches renamed files; the file name catches unreadable ones
+                family = font.get("family", "").lower()
+                if "gill" in family or "gill" in font["name"].lower() or "sans" in font["name"].lower():
+                    found_fonts.append(font["path"])
+        else:
+            print("  No OTF files found")
     
     print(f"\n=== GILL SANS CANDIDATES ===")
     if found_fonts:
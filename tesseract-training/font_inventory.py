@@ -0,0 +1,263 @@
+import os
+import json
+import shutil
+import struct
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Locations checked for OTF font files, in order
+TRAINING_PATHS = ["training", "../training"]
+FONT_EXTENSIONS = {".otf"}
+
+# Font metadata and tool versions from earlier runs, reused while the file is unchanged
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".font_inventory.json")
+CACHE_VERSION = 2
+
+# Tools the training pipeline needs: (name, version flag)
+TOOLS = [
+    ("tesseract", "--version"),
+    ("unicharset_extractor", "--version"),
+    ("mftraining", "-v"),
+    ("cntraining", "-v"),
+    ("combine_tessdata", "-v"),
+]
+TOOL_TIMEOUT = 10
+
+_cache = None
+_cache_dirty = False
+_cache_lock = threading.Lock()
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = {"fonts": {}, "tools": {}}
+        if os.path.exists(CACHE_PATH):
+            try:
+                with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    _cache["fonts"] = data.get("fonts", {})
+                    _cache["tools"] = data.get("tools", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable font inventory cache {CACHE_PATH}: {e}")
+    return _cache
+
+
+def save_cache():
+    """Write the cache atomically, if anything in it changed"""
+    global _cache_dirty
+    with _cache_lock:
+        if not _cache_dirty:
+            return
+        tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, **_cache}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, CACHE_PATH)
+            _cache_dirty = False
+        except OSError as e:
+            print(f"Could not save font inventory cache {CACHE_PATH}: {e}")
+
+
+def _cached(section, key, stat, compute, cache_errors=True, refresh=False):
+    """Cache entry for key while its file's mtime and size match stat; otherwise compute and store it
+
+    With cache_errors=False an entry with an "error" is returned but not
+    stored, so it is computed again next time. refresh=True always
+    computes the entry, and stores it for later cached lookups.
+    """
+    global _cache_dirty
+    cache = _load_cache()[section]
+    entry = cache.get(key)
+    if not refresh and entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return entry
+    entry = dict(compute(), mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    if "error" in entry and not cache_errors:
+        return entry
+    with _cache_lock:
+        cache[key] = entry
+        _cache_dirty = True
+    return entry
+
+
+def _name_records(data):
+    """nameID -> string from an OpenType 'name' table, preferring Windows English names"""
+    _, count, string_offset = struct.unpack(">HHH", data[:6])
+    names = {}
+    for i in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack(">6H", data[6 + 12 * i:18 + 12 * i])
+        raw = data[string_offset + offset:string_offset + offset + length]
+        if platform == 3 and language == 0x409:
+            names[name_id] = raw.decode("utf-16-be", "replace")
+        elif platform == 1 and language == 0 and name_id not in names:
+            names[name_id] = raw.decode("mac_roman", "replace")
+    return names
+
+
+def read_font_metadata(path):
+    """Family, style, weight and italic flag from a font's 'name' and 'OS/2' tables
+
+    Only the table directory and those two tables are read, so this is
+    cheap even for large fonts. Raises ValueError for files that aren't
+    OpenType/TrueType fonts.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b"OTTO", b"\x00\x01\x00\x00", b"true"):
+            raise ValueError("not an OpenType or TrueType font")
+        num_tables = struct.unpack(">H", header[4:6])[0]
+        directory = f.read(16 * num_tables)
+        tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack(">4sIII", directory[16 * i:16 * i + 16])
+            tables[tag] = (offset, length)
+
+        def read_table(tag):
+            offset, length = tables[tag]
+            f.seek(offset)
+            return f.read(length)
+
+        try:
+            names = _name_records(read_table(b"name")) if b"name" in tables else {}
+            weight, italic = 400, False
+            if b"OS/2" in tables:
+                os2 = read_table(b"OS/2")
+                weight = struct.unpack(">H", os2[4:6])[0]
+                italic = bool(struct.unpack(">H", os2[62:64])[0] & 1)
+        except struct.error:
+            raise ValueError("truncated font table")
+
+    # Typographic family/subfamily (16/17) group every weight under one family
+    family = names.get(16) or names.get(1) or os.path.splitext(os.path.basename(path))[0]
+    style = names.get(17) or names.get(2) or "Regular"
+    return {"family": family, "style": style, "weight": weight, "italic": italic or "italic" in style.lower()}
+
+
+def _font_entry(path):
+    try:
+        return read_font_metadata(path)
+    except (OSError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def scan_folder(folder):
+    """List one folder with os.scandir, reading font metadata only for new or changed fonts
+
+    Returns a dict with the folder's absolute path and whether it exists,
+    "fonts" (name order; each with path, name, size, family, style, weight,
+    italic, or error for unreadable fonts), other "files" as (name, size),
+    "dirs", and "error" if the folder couldn't be read.
+    """
+    result = {"path": os.path.abspath(folder), "exists": os.path.isdir(folder), "fonts": [], "files": [], "dirs": []}
+    if not result["exists"]:
+        return result
+    try:
+        with os.scandir(folder) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_dir():
+                result["dirs"].append(entry.name)
+                continue
+            stat = entry.stat()
+            if os.path.splitext(entry.name)[1].lower() in FONT_EXTENSIONS:
+                key = os.path.abspath(entry.path)
+                meta = _cached("fonts", key, stat, lambda: _font_entry(entry.path))
+                font = {k: v for k, v in meta.items() if k != "mtime_ns"}
+                result["fonts"].append(dict(font, path=entry.path, name=entry.name))
+            else:
+                result["files"].append((entry.name, stat.st_size))
+    except OSError as e:
+        result["error"] = str(e)
+    save_cache()
+    return result
+
+
+def find_training_fonts(paths=TRAINING_PATHS):
+    """The scan of the first training folder that has any fonts, or None"""
+    for training_path in paths:
+        scan = scan_folder(training_path)
+        if scan.get("error"):
+            print(f"Error reading {training_path}: {scan['error']}")
+        if scan["fonts"]:
+            return scan
+    return None
+
+
+def training_font_paths(paths=TRAINING_PATHS):
+    """Font file paths from the first training folder that has any, in name order"""
+    scan = find_training_fonts(paths)
+    return [font["path"] for font in scan["fonts"]] if scan else []
+
+
+def describe_font(font):
+    """Short description, e.g. 'Gill Sans Bold Italic (700)'"""
+    if font.get("error"):
+        return f"unreadable: {font['error']}"
+    return f"{font['family']} {font['style']} ({font['weight']})"
+
+
+def _probe_tool(name, flag, refresh=False):
+    executable = shutil.which(name)
+    if executable is None:
+        return {"available": False, "version": None}
+
+    def run():
+        try:
+            result = subprocess.run([executable, flag], capture_output=True, text=True, timeout=TOOL_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return {"available": False, "version": None, "error": str(e)}
+        output = (result.stdout or result.stderr).strip()
+        return {"available": True, "version": output.splitlines()[0] if output else "unknown"}
+
+    # A timeout or a failed launch may be temporary, so it is retried on the next probe
+    entry = _cached("tools", f"{name} {flag} {os.path.abspath(executable)}", os.stat(executable), run,
+                    cache_errors=False, refresh=refresh)
+    return dict(entry, path=executable)
+
+
+def probe_tools(tools=TOOLS):
+    """Check every tool at once; returns {name: {"available", "version", "path"}}
+
+    The tools are run concurrently, and a tool whose executable is unchanged
+    since it was last probed isn't run at all.
+    """
+    _load_cache()
+    with ThreadPoolExecutor(max_workers=len(tools) or 1) as executor:
+        results = dict(zip([name for name, _ in tools], executor.map(lambda t: _probe_tool(*t), tools)))
+    save_cache()
+    return results
+
+
+def tool_version(name):
+    """Version line of one tool from TOOLS, or None if it isn't installed
+
+    Always runs the tool: the cache only sees the executable, and upgrading
+    libtesseract changes the version without touching it. Build manifests
+    hash this version, so a stale one would keep outdated outputs fresh.
+    """
+    flag = dict(TOOLS).get(name, "--version")
+    version = _probe_tool(name, flag, refresh=True)["version"]
+    save_cache()
+    return version
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Show the training fonts and tool versions the pipeline will use")
+    parser.add_argument('folders', nargs='*', help=f"Folders to list (default: {', '.join(TRAINING_PATHS)})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for folder in args.folders or TRAINING_PATHS:
+        scan = scan_folder(folder)
+        if not scan["exists"]:
+            continue
+        print(f"{scan['path']}: {len(scan['fonts'])} font(s)")
+        for font in scan["fonts"]:
+            print(f"  - {font['name']}: {describe_font(font)}")
+    for name, tool in probe_tools().items():
+        print(f"{name}: {tool['version'] if tool['available'] else 'not found'}")
@@ -1,83 +1,315 @@
 import os
+import re
+import argparse
+import tracing
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
-import random
-import glob
-
-def generate_training_images():
-    # Training text samples
-    training_texts = [
-        "The quick brown fox jumps over the lazy dog",
-        "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
-        "abcdefghijklmnopqrstuvwxyz",
-        "0123456789",
-        "!@#$%^&*()_+-=[]{}|;:,.<>?",
-        "Binary code: 01101000 01100101 01101100 01101100 01101111",
-        "Hexadecimal: 0x48656C6C6F",
-        "Lorem ipsum dolor sit amet consectetur adipiscing elit"
+from build_cache import BuildManifest, hash_file, hash_inputs
+from font_inventory import TRAINING_PATHS, training_font_paths
+
+# Training text samples
+TRAINING_TEXTS = [
+    "The quick brown fox jumps over the lazy dog",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "abcdefghijklmnopqrstuvwxyz",
+    "0123456789",
+    "!@#$%^&*()_+-=[]{}|;:,.<>?",
+    "Binary code: 01101000 01100101 01101100 01101100 01101111",
+    "Hexadecimal: 0x48656C6C6F",
+    "Lorem ipsum dolor sit amet consectetur adipiscing elit"
+]
+
+# Font settings
+FONT_SIZES = [16, 20, 24, 28, 32]
+
+OUTPUT_DIR = "training_images"
+LANG = "gillsans"
+
+# Bump when render_text_image() changes so every cached image is redrawn
+RENDER_VERSION = 1
+RENDER_MANIFEST = ".render_manifest.json"
+
+# Fonts loaded by this process, keyed by (font_path, size)
+_font_cache = {}
+
+
+def find_font_files():
+    """Return the OTF font files from the first training folder that has any"""
+    return training_font_paths()
+
+
+def font_slug(font_path):
+    """Tesseract font name for a font file, e.g. 'Gill Sans Bold.otf' -> 'gillsansbold'"""
+    name = os.path.splitext(os.path.basename(font_path))[0]
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def training_image_name(font_path, index, size):
+    """File name of a rendered image: <lang>.<font>.exp<index>.<size>.tif"""
+    return f"{LANG}.{font_slug(font_path)}.exp{index}.{size}.tif"
+
+
+def load_font(font_path, size):
+    """Load a font once per process and reuse it for every later render"""
+    key = (font_path, size)
+    font = _font_cache.get(key)
+    if font is None:
+        font = ImageFont.truetype(font_path, size)
+        _font_cache[key] = font
+    return font
+
+
+def render_text_image(font_path, text, size):
+    """Render text in black on a white background with a 20px margin"""
+    font = load_font(font_path, size)
+
+    # Calculate image size
+    bbox = font.getbbox(text)
+    width = bbox[2] - bbox[0] + 40
+    height = bbox[3] - bbox[1] + 40
+
+    # Create white background image and draw text in black
+    img = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((20, 20), text, font=font, fill='black')
+    return img
+
+
+def training_batch_name(font_path):
+    """File name of a multi-page batch: <lang>.<font>.batch.tif"""
+    return f"{LANG}.{font_slug(font_path)}.batch.tif"
+
+
+def box_lines(font_path, text, size, height, page):
+    """Tesseract box lines for text as drawn by render_text_image()
+
+    Box coordinates are "<char> left bottom right top page" with the origin
+    at the bottom-left corner of the page. Whitespace gets no box.
+    """
+    font = load_font(font_path, size)
+    lines = []
+    for i, char in enumerate(text):
+        if char.isspace():
+            continue
+        x = 20 + font.getlength(text[:i])
+        left, top, right, bottom = font.getbbox(char)
+        lines.append(
+            f"{char} {int(x + left)} {height - (20 + bottom)} {int(x + right + 0.5)} {height - (20 + top)} {page}"
+        )
+    return lines
+
+
+def render_training_image(job):
+    """Render and save one (font, text, size) combination; runs in a worker process"""
+    font_path, index, text, size, output_dir = job
+    filename = training_image_name(font_path, index, size)
+    path = os.path.join(output_dir, filename)
+    tags = {"font": font_slug(font_path), "size": size, "text": index}
+    try:
+        with tracing.span("render", "render", **tags):
+            img = render_text_image(font_path, text, size)
+        with tracing.span("save", "render", outputs=[path], **tags):
+            img.save(path)
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
+
+def render_training_batch(job):
+    """Render every text x size for one font into a multi-page TIFF plus its .box file"""
+    font_path, texts, sizes, output_dir = job
+    filename = training_batch_name(font_path)
+    try:
+        pages = []
+        boxes = []
+        font = font_slug(font_path)
+        for size in sizes:
+            for index, text in enumerate(texts):
+                with tracing.span("render", "render", font=font, size=size, text=index):
+                    img = render_text_image(font_path, text, size)
+                    boxes.extend(box_lines(font_path, text, size, img.height, len(pages)))
+                pages.append(img)
+
+        path = os.path.join(output_dir, filename)
+        box_path = os.path.splitext(path)[0] + ".box"
+        with tracing.span("save", "render", outputs=[path, box_path], font=font, pages=len(pages)):
+            pages[0].save(path, save_all=True, append_images=pages[1:])
+            with open(box_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(boxes) + "\n")
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
+
+def build_jobs(font_files, texts, sizes, output_dir):
+    """List every render job, grouped so consecutive jobs share a font and size"""
+    return [
+        (font_path, index, text, size, output_dir)
+        for font_path in font_files
+        for size in sizes
+        for index, text in enumerate(texts)
     ]
-    
-    # Font settings
-    font_sizes = [16, 20, 24, 28, 32]
-    
-    # Find OTF font files in training folder (check both locations)
-    training_paths = ["training", "../training"]
-    otf_files = []
-    
-    for training_path in training_paths:
-        if os.path.exists(training_path):
-            try:
-                all_files = os.listdir(training_path)
-                found_otf = [os.path.join(training_path, f) for f in all_files if f.lower().endswith('.otf')]
-                otf_files.extend(found_otf)
-                if found_otf:
-                    break  # Use first location that has files
-            except Exception as e:
-                print(f"Error reading {training_path}: {e}")
-    
-    if not otf_files:
+
+
+def render_digest(font_digest, text, size):
+    """Digest of everything that determines a rendered image"""
+    return hash_inputs("render", RENDER_VERSION, font_digest, text, size)
+
+
+def batch_digest(font_digest, texts, sizes):
+    """Digest of everything that determines a font's batch TIFF and .box file"""
+    return hash_inputs("batch", RENDER_VERSION, font_digest, list(texts), list(sizes))
+
+
+def remove_outputs(paths):
+    """Delete rendered files along with the .box/.tr files training made from them"""
+    for path in paths:
+        base = os.path.splitext(path)[0]
+        for stale in (path, base + ".box", base + ".tr"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+
+def generate_training_images(font_files=None, texts=None, sizes=None, jobs=None, output_dir=OUTPUT_DIR, force=False,
+                             layout="image", on_rendered=None):
+    """Render every font x text x size combination across a process pool
+
+    With layout="image" each combination is its own TIFF for makebox to box.
+    With layout="batch" each font becomes one multi-page TIFF with a matching
+    .box file, so training needs one tesseract launch per font.
+
+    Outputs whose inputs are unchanged since the last run are skipped unless
+    force is set. Outputs of earlier runs whose font, text or size is no longer
+    rendered (or that used the other layout) are deleted, so training doesn't
+    pick them up from the folder. on_rendered, if given, is called with the path of every
+    output as soon as it is ready: straight away for up-to-date ones, and
+    as each render finishes otherwise.
+    """
+    texts = texts or TRAINING_TEXTS
+    sizes = sizes or FONT_SIZES
+
+    if font_files is None:
+        font_files = find_font_files()
+
+    if not font_files:
         print("No OTF font files found in training folders")
-        print("Checked: training, ../training")
-        return
-    
-    # Use the regular Gill Sans font (not bold, italic, etc.) for training
-    font_path = None
-    for font in otf_files:
-        if "Gill Sans.otf" in font:  # Exact match for regular weight
-            font_path = font
-            break
-    
-    if not font_path:
-        font_path = otf_files[0]  # Use first available if regular not found
-    
-    print(f"Using font: {font_path}")
-    
-    os.makedirs("training_images", exist_ok=True)
-    
-    for i, text in enumerate(training_texts):
-        for size in font_sizes:
-            try:
-                # Create image
-                font = ImageFont.truetype(font_path, size)
-                
-                # Calculate image size
-                bbox = font.getbbox(text)
-                width = bbox[2] - bbox[0] + 40
-                height = bbox[3] - bbox[1] + 40
-                
-                # Create white background image
-                img = Image.new('RGB', (width, height), 'white')
-                draw = ImageDraw.Draw(img)
-                
-                # Draw text in black
-                draw.text((20, 20), text, font=font, fill='black')
-                
-                # Save image
-                filename = f"gillsans.exp{i}.{size}.tif"
-                img.save(f"training_images/{filename}")
-                
-                print(f"Generated: {filename}")
-            except Exception as e:
-                print(f"Error generating image with size {size}: {e}")
+        print(f"Checked: {', '.join(TRAINING_PATHS)}")
+        return []
+
+    print(f"Using {len(font_files)} font(s):")
+    for font_path in font_files:
+        print(f"  - {font_path}")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = BuildManifest(os.path.join(output_dir, RENDER_MANIFEST))
+    font_digests = {font_path: hash_file(font_path) for font_path in font_files}
+
+    digests = {}
+    outputs = {}
+    render_jobs = []
+    fresh = []
+    if layout == "batch":
+        render = render_training_batch
+        chunksize = 1
+        all_jobs = [(font_path, texts, sizes, output_dir) for font_path in font_files]
+        for job in all_jobs:
+            filename = training_batch_name(job[0])
+            digests[filename] = batch_digest(font_digests[job[0]], texts, sizes)
+            path = os.path.join(output_dir, filename)
+            outputs[filename] = [path, os.path.splitext(path)[0] + ".box"]
+            if force or not manifest.is_fresh(filename, digests[filename]):
+                render_jobs.append(job)
+            else:
+                fresh.append(filename)
+    else:
+        render = render_training_image
+        # One chunk per (font, size) keeps each worker's font cache hot
+        chunksize = len(texts)
+        all_jobs = build_jobs(font_files, texts, sizes, output_dir)
+        for job in all_jobs:
+            font_path, index, text, size, _ = job
+            filename = training_image_name(font_path, index, size)
+            digests[filename] = render_digest(font_digests[font_path], text, size)
+            outputs[filename] = [os.path.join(output_dir, filename)]
+            if force or not manifest.is_fresh(filename, digests[filename]):
+                render_jobs.append(job)
+            else:
+                fresh.append(filename)
+
+    stale = manifest.prune(digests)
+    remove_outputs(stale)
+    removed = sum(path.endswith(".tif") for path in stale)
+    if removed:
+        print(f"Removed {removed} image(s) no longer in the training set")
+
+    up_to_date = len(all_jobs) - len(render_jobs)
+    if up_to_date:
+        print(f"Up to date: {up_to_date} file(s)")
+        if on_rendered:
+            for filename in fresh:
+                on_rendered(outputs[filename][0])
+
+    generated = []
+    failed = []
+
+    if render_jobs:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for filename, error in executor.map(render, render_jobs, chunksize=chunksize):
+                if error:
+                    print(f"Error generating {filename}: {error}")
+                    manifest.forget(filename)
+                    failed.append(filename)
+                else:
+                    print(f"Generated: {filename}")
+                    manifest.record(filename, digests[filename], outputs[filename])
+                    generated.append(filename)
+                    if on_rendered:
+                        on_rendered(outputs[filename][0])
+    manifest.save()
+
+    print(f"\nGenerated {len(generated)} of {len(all_jobs)} files in {output_dir}")
+    if failed:
+        print(f"Failed: {len(failed)} image(s)")
+    return generated
+
+
+def read_texts_file(path):
+    """Read one training text per non-empty line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render Tesseract training images for every Gill Sans weight")
+    parser.add_argument('--fonts', nargs='+', help="Font files to render (default: every OTF in the training folder)")
+    parser.add_argument('--sizes', nargs='+', type=int, help=f"Font sizes (default: {' '.join(map(str, FONT_SIZES))})")
+    parser.add_argument('--texts-file', help="File with one training text per line (default: built-in samples)")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f"Output folder (default: {OUTPUT_DIR})")
+    parser.add_argument('--force', action='store_true', help="Re-render images even if their inputs are unchanged")
+    parser.add_argument('--layout', choices=["image", "batch"], default="image",
+                        help="One TIFF per image, or one multi-page TIFF + .box per font (default: image)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Record every render and save; write a Chrome trace to PATH and print a summary")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    generate_training_images()
+    args = parse_args()
+    texts = read_texts_file(args.texts_file) if args.texts_file else None
+    if args.trace:
+        tracing.enable()
+    try:
+        generate_training_images(
+            font_files=args.fonts,
+            texts=texts,
+            sizes=args.sizes,
+            jobs=args.jobs,
+            output_dir=args.output_dir,
+            force=args.force,
+            layout=args.layout,
+        )
+    finally:
+        if args.trace:
+            tracing.finish(args.trace)
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_WHITESPACE = b" \t\n\r\v\f"
+
+# How much each decoded byte looks like English text; used to find byte alignment
+_BYTE_SCORES = np.full(256, -4.0)
+_BYTE_SCORES[33:127] = 0.5
+_BYTE_SCORES[list(b"\t\n\r")] = 0.5
+_BYTE_SCORES[48:58] = 1.0
+_BYTE_SCORES[list(b" ")] = 2.0
+_BYTE_SCORES[65:91] = 2.0
+_BYTE_SCORES[97:123] = 2.0
+_BYTE_SCORES[128:] = -1.0
+
+# Per input character: 0 or 1 for bits (after OCR corrections), 2 for whitespace, 3 to ignore
+_OCR_CLASS = np.full(256, 3, dtype=np.uint8)
+_OCR_CLASS[list(b"0OoQD[]")] = 0
+_OCR_CLASS[list(b"1lI|!")] = 1
+_OCR_CLASS[list(_WHITESPACE)] = 2
+
+# Score bonus for a byte that starts on a spaced group
+GROUP_START_BONUS = 3.0
+
+# Score a realignment must gain over keeping the current one, so noise doesn't cause shifts
+SHIFT_PENALTY = 2.0
+
+# Bit offsets from one byte to the next beyond the usual 8, nearest first: ties keep the nearer one
+_OFFSETS = (0, 1, -1, 2, -2, 3, -3, 4)
+
+# Inputs and expected output shared with realignBits() in binary-decoder.js (see check-realign.js)
+REALIGN_VECTORS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "realign_vectors.json")
+
+
+def extract_bits(text):
+    """OCR-corrected bits of a text, plus a mask of bits that start a spaced group"""
+    data = text.encode('utf-8') if isinstance(text, str) else text
+    cls = _OCR_CLASS[np.frombuffer(data, dtype=np.uint8)]
+    is_bit = cls < 2
+    # A bit starts a group when the last non-ignored character before it was whitespace
+    relevant = cls != 3
+    prev_class = np.concatenate(([2], cls[relevant][:-1]))
+    starts_all = np.zeros(cls.size, dtype=bool)
+    starts_all[relevant] = prev_class == 2
+    return cls[is_bit], starts_all[is_bit]
+
+
+def realign_bits(bits, group_starts=None):
+    """Decode a bitstream whose byte boundaries may be lost or shifted
+
+    Every bit position is scored by how printable the byte starting there
+    is, with a bonus where the input had a space. The decoded bytes are the
+    best-scoring chain of positions where each byte starts 8 bits after the
+    previous one, or up to 3 bits before / 4 bits after that at a cost of
+    SHIFT_PENALTY. The chain starts in the first byte and runs to the last,
+    so the phase at every slip, including one in the first few bytes, is
+    chosen from the bits on both sides of it.
+
+    realignBits() in binary-decoder.js must return the same bytes, ties
+    included: a position prefers a fresh start, then the offsets in
+    _OFFSETS order; the chain ends at the earliest best final position.
+    """
+    n = bits.size
+    if n < 8:
+        return b''
+    values = np.packbits(sliding_window_view(bits.astype(bool), 8), axis=1)[:, 0]
+    score = _BYTE_SCORES[values]
+    if group_starts is not None:
+        score = score + GROUP_START_BONUS * group_starts[:values.size]
+
+    # best[p]: score of the best chain ending with the byte at p; back[p]: the byte before it
+    count = values.size
+    score = score.tolist()
+    best = [0.0] * count
+    back = [-1] * count
+    for p in range(count):
+        total, previous = (0.0, -1) if p < 8 else (-np.inf, -1)
+        for shift in _OFFSETS:
+            q = p - 8 - shift
+            if q < 0:
+                continue
+            candidate = best[q] - SHIFT_PENALTY if shift else best[q]
+            if candidate > total:
+                total, previous = candidate, q
+        best[p] = total + score[p]
+        back[p] = previous
+
+    # The last byte is one no unshifted byte can follow
+    p = max(range(max(count - 8, 0), count), key=best.__getitem__)
+    positions = []
+    while p >= 0:
+        positions.append(p)
+        p = back[p]
+    return values[positions[::-1]].tobytes()
+
+
+def decode_ocr_text(text, encoding='latin-1'):
+    """Decode OCR output of a binary wall, recovering byte alignment where groups are broken"""
+    bits, group_starts = extract_bits(text)
+    return realign_bits(bits, group_starts).decode(encoding, errors='replace')
+
+
+def check_vectors(path=REALIGN_VECTORS):
+    """Compare realign_bits() with the expected output of each shared test vector"""
+    with open(path, encoding="utf-8") as f:
+        vectors = json.load(f)
+    failures = 0
+    for vector in vectors:
+        bits = np.array([int(c) for c in vector["bits"]], dtype=np.uint8)
+        starts = np.array([int(c) for c in vector["group_starts"]], dtype=bool)
+        got = realign_bits(bits, starts).decode('latin-1')
+        if got != vector["expected"]:
+            failures += 1
+            print(f"FAIL {vector['name']}: expected {vector['expected']!r}, got {got!r}")
+    print(f"{len(vectors) - failures}/{len(vectors)} realignment vectors passed")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_vectors() else 1)
@@ -0,0 +1,91 @@
+import io
+import os
+import subprocess
+import tempfile
+import tracing
+
+TESSDATA_DIR = "tessdata"
+
+
+def encode_image(img):
+    """Encode a PIL image as uncompressed PNM, which is cheap to write and for tesseract to read"""
+    if img.mode not in ("1", "L", "RGB"):
+        img = img.convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PPM")
+    return buffer.getvalue()
+
+
+def tesseract_args(lang="eng", tessdata_dir=None, psm=6, config=()):
+    """Command-line options shared by every in-memory tesseract call"""
+    args = []
+    if tessdata_dir:
+        args += ["--tessdata-dir", os.path.abspath(tessdata_dir)]
+    args += ["-l", lang, "--psm", str(psm)]
+    return args + list(config)
+
+
+def run_tesseract(img, output_base="stdout", lang="eng", tessdata_dir=None, psm=6, config=()):
+    """Pipe an image into tesseract through stdin; return its stdout as text
+
+    Nothing is written to disk unless output_base names a file base, in which
+    case tesseract writes its usual <output_base>.<ext> output there.
+    """
+    command = ["tesseract", "stdin", output_base] + tesseract_args(lang, tessdata_dir, psm, config)
+    result = tracing.run(command, input=encode_image(img), capture_output=True, span_args={"step": "ocr"})
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"{subprocess.list2cmdline(command)} exited with {result.returncode}: {message}")
+    return result.stdout.decode("utf-8", "replace")
+
+
+def ocr_image(img, lang="eng", tessdata_dir=None, psm=6):
+    """Recognise an in-memory image without writing it to disk"""
+    return run_tesseract(img, lang=lang, tessdata_dir=tessdata_dir, psm=psm).strip()
+
+
+def run_tesseract_list(image_paths, lang="eng", tessdata_dir=None, psm=6, config=()):
+    """Run one tesseract process over several image files through a list file; return its stdout
+
+    The model is loaded once for the whole batch.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        list_path = os.path.join(tmp, "images.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(os.path.abspath(p) for p in image_paths) + "\n")
+        command = ["tesseract", list_path, "stdout"] + tesseract_args(lang, tessdata_dir, psm, config)
+        result = tracing.run(command, capture_output=True, span_args={"step": "ocr", "images": len(image_paths)})
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"{subprocess.list2cmdline(command)} exited with {result.returncode}: {message}")
+    return result.stdout.decode("utf-8", "replace")
+
+
+def ocr_files(image_paths, lang="eng", tessdata_dir=None, psm=6):
+    """Recognise several image files with a single tesseract process
+
+    Tesseract ends every page with a form feed; returns one string per
+    image, in order.
+    """
+    pages = run_tesseract_list(image_paths, lang, tessdata_dir, psm).split("\f")
+    texts = [page.strip() for page in pages[:len(image_paths)]]
+    return texts + [""] * (len(image_paths) - len(texts))
+
+
+def ocr_words(image_paths, lang="eng", tessdata_dir=None, psm=6):
+    """Recognise several image files with one tesseract process, keeping word positions
+
+    Returns, per image in order, a list of (left, top, width, height,
+    confidence, text) words from tesseract's TSV output, in its reading order.
+    """
+    pages = [[] for _ in image_paths]
+    for line in run_tesseract_list(image_paths, lang, tessdata_dir, psm, ["tsv"]).splitlines():
+        fields = line.split("\t")
+        # Level 5 rows are words; the header and page/block/line rows are skipped
+        if len(fields) < 12 or fields[0] != "5" or not fields[11].strip():
+            continue
+        page = int(fields[1]) - 1
+        if 0 <= page < len(pages):
+            left, top, width, height = map(int, fields[6:10])
+            pages[page].append((left, top, width, height, float(fields[10]), fields[11]))
+    return pages
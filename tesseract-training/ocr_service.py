@@ -0,0 +1,262 @@
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from ocr_pipe import TESSDATA_DIR, ocr_files
+from preprocess import preprocess_bytes
+
+try:
+    import tesserocr
+except ImportError:  # Listed in requirements.txt; make_engine refuses to start the default engine without it
+    tesserocr = None
+
+# Local only by default; --host 0.0.0.0 exposes the service to other machines
+HOST = "127.0.0.1"
+PORT = 8765
+LANG = "gillsans"
+PSM = 6
+
+# Engines kept loaded, images recognised per engine call, and how long a batch waits to fill
+ENGINES = 2
+BATCH_SIZE = 4
+BATCH_WAIT = 0.02
+
+# Requests queued beyond the ones being recognised; more are refused with 503 until the queue drains
+MAX_PENDING = 16
+REQUEST_TIMEOUT = 30.0
+MAX_UPLOAD_BYTES = 16 << 20
+
+# Pages allowed to call the service from the browser: the site as served by serve.py / make serve
+ALLOW_ORIGINS = ["http://localhost:8000", "http://127.0.0.1:8000"]
+
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+def tesserocr_engine(lang=LANG, tessdata_dir=TESSDATA_DIR, psm=PSM):
+    """A warm in-process engine: the model is loaded once and reused for every image"""
+    api = tesserocr.PyTessBaseAPI(path=os.path.abspath(tessdata_dir) + os.sep, lang=lang, psm=psm)
+
+    def recognise(images):
+        texts = []
+        for data in images:
+            api.SetImage(Image.open(io.BytesIO(data)))
+            texts.append(api.GetUTF8Text().strip())
+        return texts
+    return recognise
+
+
+def cli_engine(lang=LANG, tessdata_dir=TESSDATA_DIR, psm=PSM):
+    """Recognise each batch with one tesseract process, so the model loads once per batch"""
+    def recognise(images):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, data in enumerate(images):
+                path = os.path.join(tmp, f"{i}.img")
+                with open(path, "wb") as f:
+                    f.write(data)
+                paths.append(path)
+            return ocr_files(paths, lang=lang, tessdata_dir=tessdata_dir, psm=psm)
+    return recognise
+
+
+def with_preprocessing(recognise, method):
+    """Binarize, denoise, deskew and crop each image before the engine sees it"""
+    def preprocessed(images):
+        return recognise([preprocess_bytes(data, method) for data in images])
+    return preprocessed
+
+
+def make_engine(kind="tesserocr", lang=LANG, tessdata_dir=TESSDATA_DIR, psm=PSM, preprocess=None):
+    if kind == "tesserocr":
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed. Run pip install -r requirements.txt, "
+                               "or pass --engine cli to start a tesseract process per batch")
+        recognise = tesserocr_engine(lang, tessdata_dir, psm)
+    else:
+        recognise = cli_engine(lang, tessdata_dir, psm)
+    return with_preprocessing(recognise, preprocess) if preprocess else recognise
+
+
+async def engine_worker(queue, recognise, executor, stats, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+    """Pull queued requests into batches and recognise them on one engine"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + batch_wait
+        while len(batch) < batch_size:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0)))
+            except asyncio.TimeoutError:
+                break
+        # Requests whose client already gave up aren't worth recognising
+        batch = [(data, future) for data, future in batch if not future.done()]
+        if not batch:
+            continue
+        try:
+            texts = await loop.run_in_executor(executor, recognise, [data for data, _ in batch])
+        except Exception as e:
+            texts = [e] * len(batch)
+        stats["batches"] += 1
+        stats["images"] += len(batch)
+        for (_, future), text in zip(batch, texts):
+            if future.done():
+                continue
+            if isinstance(text, Exception):
+                future.set_exception(text)
+            else:
+                future.set_result(text)
+
+
+def cors_headers(origin, allow_origins):
+    """CORS headers for a request from origin, or none if that page isn't allowed to call the service"""
+    if "*" in allow_origins:
+        allowed = "*"
+    elif origin in allow_origins:
+        allowed = origin
+    else:
+        return [("Vary", "Origin")]
+    return [
+        ("Access-Control-Allow-Origin", allowed),
+        ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+        ("Access-Control-Allow-Headers", "Content-Type"),
+        ("Vary", "Origin"),
+    ]
+
+
+def json_response(status, payload, headers=()):
+    return status, json.dumps(payload).encode("utf-8"), [("Content-Type", "application/json")] + list(headers)
+
+
+async def handle_ocr(body, queue):
+    """Queue one uploaded image and wait for its text"""
+    try:
+        Image.open(io.BytesIO(body)).verify()
+    except Exception:
+        return json_response(400, {"error": "body is not an image"})
+    if queue.full():
+        return json_response(503, {"error": "busy"}, [("Retry-After", "1")])
+
+    future = asyncio.get_running_loop().create_future()
+    queue.put_nowait((body, future))
+    start = time.perf_counter()
+    try:
+        text = await asyncio.wait_for(future, REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        return json_response(504, {"error": "timed out"})
+    except Exception as e:
+        return json_response(500, {"error": str(e)})
+    return json_response(200, {"text": text, "ms": round((time.perf_counter() - start) * 1000)})
+
+
+async def route(method, path, body, queue, stats):
+    path = path.split("?", 1)[0]
+    if method == "OPTIONS":
+        return 204, b"", []
+    if path == "/ocr" and method == "POST":
+        return await handle_ocr(body, queue)
+    if path == "/health" and method == "GET":
+        return json_response(200, dict(stats, pending=queue.qsize()))
+    return json_response(404, {"error": f"no route for {method} {path}"})
+
+
+async def handle_connection(reader, writer, queue, stats, allow_origins=ALLOW_ORIGINS):
+    """Minimal HTTP/1.1: one request at a time per connection, kept alive until the client closes"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path = request_line.decode("latin-1").split()[:2]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0) or 0)
+            keep_alive = headers.get("connection", "").lower() != "close"
+            if length > MAX_UPLOAD_BYTES:
+                status, payload, extra = json_response(413, {"error": "image too large"})
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload, extra = await route(method, path, body, queue, stats)
+
+            response_headers = [
+                ("Content-Length", str(len(payload))),
+                ("Connection", "keep-alive" if keep_alive else "close"),
+            ] + cors_headers(headers.get("origin"), allow_origins) + extra
+            head = f"HTTP/1.1 {status} {REASONS[status]}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in response_headers)
+            writer.write(head.encode("latin-1") + b"\r\n" + payload)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, engines=ENGINES, batch_size=BATCH_SIZE, max_pending=MAX_PENDING,
+                kind="tesserocr", lang=LANG, tessdata_dir=TESSDATA_DIR, preprocess=None, allow_origins=ALLOW_ORIGINS):
+    queue = asyncio.Queue(maxsize=max_pending)
+    stats = {"engine": kind, "engines": engines,
+             "preprocess": preprocess, "batches": 0, "images": 0}
+    executor = ThreadPoolExecutor(max_workers=engines)
+    # Load every engine before accepting connections, so the first requests don't pay for it
+    recognisers = [make_engine(kind, lang, tessdata_dir, preprocess=preprocess) for _ in range(engines)]
+    workers = [asyncio.create_task(engine_worker(queue, r, executor, stats, batch_size)) for r in recognisers]
+
+    server = await asyncio.start_server(lambda r, w: handle_connection(r, w, queue, stats, allow_origins), host, port)
+    print(f"OCR service on http://{host}:{port}/ocr ({engines} {stats['engine']} engine(s), lang {lang})")
+    print(f"Open a page from {', '.join(allow_origins)} with ?ocr-service=http://{host}:{port}/ocr to use it")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        executor.shutdown(wait=False)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve OCR from a pool of warm tesseract engines")
+    parser.add_argument('--host', default=HOST, help=f"Address to listen on (default: {HOST})")
+    parser.add_argument('--port', type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument('--engines', type=int, default=ENGINES, help=f"Engines kept loaded (default: {ENGINES})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"Most images recognised per engine call (default: {BATCH_SIZE})")
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING,
+                        help=f"Queued requests before new ones get 503 (default: {MAX_PENDING})")
+    parser.add_argument('--engine', choices=["tesserocr", "cli"], default="tesserocr",
+                        help="tesserocr keeps models in memory; cli runs tesseract per batch (default: tesserocr)")
+    parser.add_argument('--lang', default=LANG, help=f"Model to load (default: {LANG})")
+    parser.add_argument('--tessdata-dir', default=TESSDATA_DIR, help=f"Folder with the model (default: {TESSDATA_DIR})")
+    parser.add_argument('--preprocess', choices=["sauvola", "otsu"],
+                        help="Binarize, denoise, deskew and crop uploads before OCR (default: off)")
+    parser.add_argument('--allow-origin', action='append', dest='allow_origins', metavar='ORIGIN',
+                        help=f"Page origin allowed to call the service, repeatable; * allows any "
+                             f"(default: {' '.join(ALLOW_ORIGINS)})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.engines, args.batch_size, args.max_pending,
+                          args.engine, args.lang, args.tessdata_dir, args.preprocess,
+                          args.allow_origins or ALLOW_ORIGINS))
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
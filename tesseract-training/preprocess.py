@@ -0,0 +1,206 @@
+import io
+import argparse
+import numpy as np
+from PIL import Image
+
+# Rows processed at a time; intermediate float arrays only ever cover one strip plus its halo
+STRIP_ROWS = 512
+
+# Sauvola: window size in pixels, sensitivity k, and dynamic range of the standard deviation
+SAUVOLA_WINDOW = 31
+SAUVOLA_K = 0.2
+SAUVOLA_R = 128.0
+
+# Deskew search: angles tried in degrees, and the longest side of the image it runs on
+DESKEW_RANGE = 5.0
+DESKEW_STEP = 0.2
+DESKEW_SIZE = 1000
+
+# White border kept around the text when cropping
+CROP_MARGIN = 16
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def iter_gray_strips(img, rows=STRIP_ROWS, halo=0):
+    """Yield (y0, y1, gray) per strip, where gray holds rows y0-halo .. y1+halo as float32
+
+    The halo is filled by reflecting the image at its top and bottom edges,
+    so window operations on each strip match the whole-image result.
+    """
+    height = img.height
+    for y0 in range(0, height, rows):
+        y1 = min(y0 + rows, height)
+        top, bottom = max(y0 - halo, 0), min(y1 + halo, height)
+        strip = np.asarray(img.crop((0, top, img.width, bottom)))
+        if strip.ndim == 3:
+            gray = strip[..., :3].astype(np.float32) @ _LUMA
+        else:
+            gray = strip.astype(np.float32)
+        pad = ((halo - (y0 - top), halo - (bottom - y1)), (0, 0))
+        if halo:
+            gray = np.pad(gray, pad, mode="reflect" if min(gray.shape[0], img.height) > halo else "edge")
+        yield y0, y1, gray
+
+
+def to_grayscale(img, rows=STRIP_ROWS):
+    """Luminance of an image as a uint8 array, converted one strip at a time"""
+    out = np.empty((img.height, img.width), dtype=np.uint8)
+    for y0, y1, gray in iter_gray_strips(img, rows):
+        out[y0:y1] = np.clip(gray + 0.5, 0, 255)
+    return out
+
+
+def otsu_threshold(gray):
+    """Global threshold maximising the between-class variance of the histogram"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * levels)
+    total, total_mean = weight[-1], mean[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weight - mean * total) ** 2 / (weight * (total - weight))
+    if np.isnan(between).all():
+        return int(gray.min()) - 1  # A single grey level: all background
+    return int(np.nanargmax(between))
+
+
+def _window_sums(a, radius):
+    """Sum over the (2r+1)-square window around every pixel at least r from a's edges"""
+    ii = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(a, axis=0, dtype=np.float64), axis=1, out=ii[1:, 1:])
+    d = 2 * radius + 1
+    return ii[d:, d:] - ii[:-d, d:] - ii[d:, :-d] + ii[:-d, :-d]
+
+
+def sauvola_binarize(img, window=SAUVOLA_WINDOW, k=SAUVOLA_K, r=SAUVOLA_R, rows=STRIP_ROWS):
+    """Adaptive threshold T = mean * (1 + k * (std / r - 1)) over a sliding window
+
+    Copes with glare and shadows that defeat a single global threshold.
+    Returns a uint8 array with text 0 and background 255.
+    """
+    radius = window // 2
+    area = (2 * radius + 1) ** 2
+    out = np.empty((img.height, img.width), dtype=np.uint8)
+    for y0, y1, gray in iter_gray_strips(img, rows, halo=radius):
+        padded = np.pad(gray, ((0, 0), (radius, radius)), mode="reflect" if gray.shape[1] > radius else "edge")
+        mean = _window_sums(padded, radius) / area
+        variance = _window_sums(padded * padded, radius) / area - mean * mean
+        threshold = mean * (1 + k * (np.sqrt(np.maximum(variance, 0)) / r - 1))
+        out[y0:y1] = np.where(gray[radius:radius + (y1 - y0)] > threshold, 255, 0)
+    return out
+
+
+def otsu_binarize(img, rows=STRIP_ROWS):
+    """Binarize with one global Otsu threshold; text 0, background 255"""
+    gray = to_grayscale(img, rows)
+    return np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8)
+
+
+def denoise(binary, rows=STRIP_ROWS):
+    """Remove isolated dark specks and fill single-pixel holes, leaving thin strokes alone
+
+    A dark pixel with at most one dark neighbour becomes white; a light
+    pixel with seven or more dark neighbours becomes dark.
+    """
+    height = binary.shape[0]
+    out = binary.copy()
+    for y0 in range(0, height, rows):
+        y1 = min(y0 + rows, height)
+        dark = np.pad(binary[max(y0 - 1, 0):y1 + 1] == 0, ((y0 == 0, y1 == height), (1, 1)))
+        neighbours = sum(
+            dark[1 + dy:dark.shape[0] - 1 + dy, 1 + dx:dark.shape[1] - 1 + dx]
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+        )
+        centre = dark[1:-1, 1:-1]
+        out[y0:y1][centre & (neighbours <= 1)] = 255
+        out[y0:y1][~centre & (neighbours >= 7)] = 0
+    return out
+
+
+def estimate_skew(binary, angle_range=DESKEW_RANGE, step=DESKEW_STEP, size=DESKEW_SIZE):
+    """Counter-clockwise rotation of the text in degrees, as PIL's rotate() measures it
+
+    Dark pixel coordinates of a downscaled copy are projected onto rows at
+    each candidate angle; straight text lines give the peakiest profile.
+    """
+    scale = min(1.0, size / max(binary.shape))
+    if scale < 1:
+        small = Image.fromarray(binary).resize(
+            (max(1, int(binary.shape[1] * scale)), max(1, int(binary.shape[0] * scale))), Image.BOX)
+        dark = np.asarray(small) < 128
+    else:
+        dark = binary == 0
+    ys, xs = np.nonzero(dark)
+    if ys.size < 10:
+        return 0.0
+    ys = ys - ys.mean()
+    xs = xs - xs.mean()
+    angles = np.arange(-angle_range, angle_range + step / 2, step)
+    radians = np.radians(angles)[:, None]
+    projected = np.round(ys * np.cos(radians) + xs * np.sin(radians)).astype(np.int64)
+    projected -= projected.min()
+    scores = [np.square(np.bincount(row)).sum() for row in projected]
+    return round(float(angles[int(np.argmax(scores))]), 2)
+
+
+def crop_to_content(binary, margin=CROP_MARGIN):
+    """Trim white borders, keeping a margin; an empty page is returned unchanged"""
+    rows = np.flatnonzero((binary == 0).any(axis=1))
+    cols = np.flatnonzero((binary == 0).any(axis=0))
+    if rows.size == 0:
+        return binary
+    top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, binary.shape[0])
+    left, right = max(cols[0] - margin, 0), min(cols[-1] + margin + 1, binary.shape[1])
+    return binary[top:bottom, left:right]
+
+
+def preprocess_image(img, method="sauvola", deskew=True, clean=True, crop=True, rows=STRIP_ROWS):
+    """Binarize, denoise, deskew and crop a PIL image for tesseract; returns a mode "L" image
+
+    method is "sauvola" (adaptive, for photos) or "otsu" (global, for clean
+    scans). Large images are processed in strips of `rows` rows, so peak
+    memory stays a few bytes per pixel.
+    """
+    if img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGB")
+    binary = sauvola_binarize(img, rows=rows) if method == "sauvola" else otsu_binarize(img, rows)
+    if clean:
+        binary = denoise(binary, rows)
+    if deskew:
+        angle = estimate_skew(binary)
+        if angle:
+            binary = np.asarray(Image.fromarray(binary).rotate(
+                -angle, resample=Image.NEAREST, expand=True, fillcolor=255))
+    if crop:
+        binary = crop_to_content(binary)
+    return Image.fromarray(np.ascontiguousarray(binary))
+
+
+def preprocess_bytes(data, method="sauvola"):
+    """Preprocess an encoded image and return it as PNG, for callers that pass images around as bytes"""
+    with Image.open(io.BytesIO(data)) as img:
+        result = preprocess_image(img, method)
+    buffer = io.BytesIO()
+    result.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Binarize, denoise, deskew and crop an image for OCR")
+    parser.add_argument('input', help="Image to preprocess")
+    parser.add_argument('output', help="Where to write the result (PNG or TIFF recommended)")
+    parser.add_argument('--method', choices=["sauvola", "otsu"], default="sauvola",
+                        help="Adaptive (photos) or global (clean scans) threshold (default: sauvola)")
+    parser.add_argument('--no-deskew', action='store_true', help="Skip skew correction")
+    parser.add_argument('--no-denoise', action='store_true', help="Skip speck removal")
+    parser.add_argument('--no-crop', action='store_true', help="Keep the white borders")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with Image.open(args.input) as source:
+        result = preprocess_image(source, args.method, not args.no_deskew, not args.no_denoise, not args.no_crop)
+    result.save(args.output)
+    print(f"Wrote {args.output} ({result.width}x{result.height})")
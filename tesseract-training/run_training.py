@@ -1,57 +1,189 @@
-import subprocess
 import sys
 import os
+import time
+import argparse
+import threading
+import tracing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from augment_training_data import AUGMENTED_DIR, augment_training_images
+from build_cache import BuildManifest
+from generate_training_data import OUTPUT_DIR, generate_training_images
+from test_model import RESULTS_DIR, evaluate_images, evaluation_samples
+from train_model import (BOX_MANIFEST, LANG, MODEL_PATH, box_digest, find_training_images, is_batch_image,
+                         process_training_image, run_command, train_from_images)
 
-def run_step(step_name, script_name):
-    """Run a training step and handle errors"""
+
+def stage(name, started):
+    """Print a stage banner with the time since the pipeline started"""
     print(f"\n{'='*50}")
-    print(f"STEP: {step_name}")
+    print(f"STAGE: {name} (+{time.perf_counter() - started:.1f}s)")
     print(f"{'='*50}")
-    
-    try:
-        result = subprocess.run([sys.executable, script_name], check=True, capture_output=True, text=True)
-        print(result.stdout)
-        if result.stderr:
-            print(f"Warnings: {result.stderr}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error in {step_name}:")
-        print(f"stdout: {e.stdout}")
-        print(f"stderr: {e.stderr}")
+
+
+class BoxStage:
+    """Steps 1-2 (makebox, box.train) on a thread pool, fed one image at a time
+
+    Images are submitted as they appear, so box files are made while later
+    images are still being rendered.
+    """
+
+    def __init__(self, images_dir, layout, jobs=None, force=False):
+        self.layout = layout
+        self.force = force
+        self.manifest = BuildManifest(os.path.join(images_dir, BOX_MANIFEST))
+        self.executor = ThreadPoolExecutor(max_workers=jobs or os.cpu_count())
+        self.digests = {}
+        self.futures = {}
+        self.done = 0
+        self.lock = threading.Lock()
+
+    def submit(self, image_file):
+        if is_batch_image(image_file) != (self.layout == "batch"):
+            return
+        self.digests[image_file] = box_digest(image_file)
+        if self.force or not self.manifest.is_fresh(os.path.basename(image_file), self.digests[image_file]):
+            future = self.executor.submit(process_training_image, image_file)
+            self.futures[future] = image_file
+            future.add_done_callback(self.report)
+
+    def report(self, future):
+        """Print each image's result as it finishes, interleaved with the render progress"""
+        with self.lock:
+            self.done += 1
+            print(f"[box {self.done}/{len(self.futures)}] {'FAILED' if future.result() else 'OK'}: "
+                  f"{self.futures[future]}")
+
+    def finish(self):
+        """Wait for every submitted image; return the images whose box/tr files are ready"""
+        failures = {}
+        up_to_date = len(self.digests) - len(self.futures)
+        if up_to_date:
+            print(f"Up to date: box and training files for {up_to_date} image(s)")
+        for future in as_completed(list(self.futures)):
+            image_file = self.futures[future]
+            key = os.path.basename(image_file)
+            error = future.result()
+            if error:
+                failures[image_file] = error
+                self.manifest.forget(key)
+            else:
+                base = os.path.splitext(image_file)[0]
+                self.manifest.record(key, self.digests[image_file], [base + ".box", base + ".tr"])
+        self.executor.shutdown()
+        self.manifest.save()
+        if failures:
+            print(f"\n{len(failures)} of {len(self.digests)} images failed:")
+        for image_file, error in sorted(failures.items()):
+            print(f"  - {image_file}: {error}")
+        return sorted(f for f in self.digests if f not in failures)
+
+
+def run_pipeline(force=False, layout="image", augment=False, jobs=None):
+    """Render, box, train and evaluate with the stages overlapping
+
+    - box/tr generation for an image starts as soon as it is rendered
+    - the eng baseline is evaluated while the single-threaded clustering
+      steps run, on one worker fewer so training keeps a CPU
+    - the new model is evaluated once both are done, so at most jobs
+      tesseract processes run at a time
+
+    With augment, boxing waits for the augmented copies instead.
+    """
+    started = time.perf_counter()
+    images_dir = AUGMENTED_DIR if augment else OUTPUT_DIR
+    boxes = BoxStage(images_dir, layout, jobs, force)
+
+    stage("Render Training Images" + ("" if augment else " + Box Files"), started)
+    with tracing.span("render images", "stage", layout=layout):
+        rendered = generate_training_images(jobs=jobs, force=force, layout=layout,
+                                            on_rendered=None if augment else boxes.submit)
+    if augment:
+        stage("Augment Training Images + Box Files", started)
+        with tracing.span("augment images", "stage"):
+            augment_training_images(jobs=jobs, include_originals=True)
+        for image_file in find_training_images(images_dir, layout):
+            boxes.submit(image_file)
+    elif not rendered and not boxes.digests:
+        print("Failed to generate training images. Stopping.")
         return False
-    except FileNotFoundError:
-        print(f"Script not found: {script_name}")
+
+    with tracing.span("wait for box files", "stage"):
+        trained = boxes.finish()
+    if not trained:
+        print("No images were processed successfully. Stopping.")
         return False
 
+    # Batch TIFFs hold many pages, so they're scored on freshly rendered held-out samples instead
+    samples = evaluation_samples(images_dir, held_out=layout == "batch")
+    baseline_jobs = max(1, (jobs or os.cpu_count()) - 1)
+    with ThreadPoolExecutor(max_workers=1) as background:
+        stage("Train Model + Evaluate eng Baseline", started)
+        baseline = background.submit(evaluate_images, samples, [("eng", None)], baseline_jobs,
+                                     output_path=os.path.join(RESULTS_DIR, "evaluation.eng.json"))
+        ok = train_from_images(trained, {f: boxes.digests[f] for f in trained}, force=force)
+        baseline.result()
+    if ok:
+        stage(f"Evaluate {LANG}", started)
+        evaluate_images(samples, [(LANG, os.path.dirname(MODEL_PATH))], jobs,
+                        output_path=os.path.join(RESULTS_DIR, f"evaluation.{LANG}.json"))
+    print(f"\nPipeline finished in {time.perf_counter() - started:.1f}s")
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the complete training pipeline with overlapping stages")
+    parser.add_argument('--force', action='store_true', help="Rebuild everything even if inputs are unchanged")
+    parser.add_argument('--batch', action='store_true',
+                        help="Render and train from per-font multi-page TIFFs instead of one TIFF per image")
+    parser.add_argument('--augment', action='store_true',
+                        help="Train on the clean images plus photo-like augmented copies")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes per stage (default: one per CPU)")
+    parser.add_argument('--trace', nargs='?', const=os.path.join(RESULTS_DIR, "trace.json"), metavar='PATH',
+                        help="Record stages, tesseract runs and renders; write a Chrome trace "
+                             f"(default: {RESULTS_DIR}/trace.json) and print where the time went")
+    return parser.parse_args()
+
+
 def main():
-    """Run complete training pipeline"""
+    """Run complete training pipeline
+
+    Each stage skips work whose inputs are unchanged since the last run;
+    pass --force to rebuild everything. Output is line-buffered, so progress
+    streams live even when piped to a log.
+    """
+    args = parse_args()
+    sys.stdout.reconfigure(line_buffering=True)
+    augment = args.augment
+    if augment and args.batch:
+        print("--augment only works with single-image TIFFs; ignoring it with --batch")
+        augment = False
     print("Starting Tesseract Gill Sans Font Training Pipeline")
-    
+
     # Check prerequisites
     if not os.path.exists("training"):
         print("Error: 'training' folder not found. Please ensure OTF font files are in the training folder.")
         return
-    
-    # Step 1: Generate training data
-    if not run_step("Generate Training Images", "generate_training_data.py"):
-        print("Failed to generate training images. Stopping.")
-        return
-    
-    # Step 2: Train the model
-    if not run_step("Train Tesseract Model", "train_model.py"):
-        print("Failed to train model. Stopping.")
+    if not run_command(["tesseract", "--version"]):
+        print("Tesseract not found. Please install Tesseract OCR with training tools.")
         return
-    
-    # Step 3: Test the model
-    if not run_step("Test Trained Model", "test_model.py"):
-        print("Failed to test model.")
+
+    if args.trace:
+        tracing.enable()
+    try:
+        ok = run_pipeline(args.force, "batch" if args.batch else "image", augment, args.jobs)
+    finally:
+        if args.trace:
+            tracing.finish(args.trace)
+    if not ok:
+        print("Training failed. Stopping.")
         return
-    
+
     print("\n" + "="*50)
     print("TRAINING COMPLETE!")
     print("="*50)
     print("Your custom Gill Sans model is ready to use.")
-    print("Model location: tessdata/gillsans.traineddata")
+    print(f"Model location: {MODEL_PATH}")
+    print(f"Evaluation results: {RESULTS_DIR}/evaluation.eng.json and evaluation.{LANG}.json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,213 @@
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from ocr_pipe import TESSDATA_DIR, ocr_words
+from preprocess import preprocess_image
+
+LANG = "gillsans"
+PSM = 6
+
+# A row or column counts as ink when this share of its pixels is dark
+INK_FRACTION = 0.002
+# Gaps between ink rows narrower than this share of the median line height don't split a line
+LINE_GAP = 0.25
+MIN_LINE_HEIGHT = 6
+
+# Lines wider than this many line heights are split into tiles, preferably at a gap between bit groups
+MAX_TILE_HEIGHTS = 40
+# Gaps wider than this share of the text height separate words; narrower ones are between letters
+WORD_GAP = 0.3
+# Where no word gap is near the tile edge, neighbouring tiles overlap by this many line heights
+OVERLAP_HEIGHTS = 8
+
+# Tiles recognised per tesseract process
+TILES_PER_BATCH = 8
+# White border added around each tile; tesseract misses text that touches the image edge
+TILE_BORDER = 10
+
+
+def ink_runs(profile, threshold):
+    """(start, end) of every run of profile entries above threshold, end exclusive"""
+    ink = np.concatenate(([False], profile > threshold, [False]))
+    edges = np.flatnonzero(np.diff(ink.astype(np.int8)))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def find_lines(binary):
+    """Text line bands (top, bottom) from the horizontal projection profile
+
+    Runs of ink rows closer than LINE_GAP of the median line height are
+    merged, so descenders and dots stay with their line. Each band is
+    padded into the space around it, never past the middle of the gap.
+    """
+    dark = binary == 0
+    runs = ink_runs(dark.sum(axis=1), INK_FRACTION * binary.shape[1])
+    runs = [(top, bottom) for top, bottom in runs if bottom - top > 1]
+    if not runs:
+        return []
+    gap = LINE_GAP * np.median([bottom - top for top, bottom in runs])
+    merged = [list(runs[0])]
+    for top, bottom in runs[1:]:
+        if top - merged[-1][1] < gap:
+            merged[-1][1] = bottom
+        else:
+            merged.append([top, bottom])
+    merged = [(top, bottom) for top, bottom in merged if bottom - top >= MIN_LINE_HEIGHT]
+
+    bands = []
+    for i, (top, bottom) in enumerate(merged):
+        pad = (bottom - top) // 4
+        above = (top - merged[i - 1][1]) // 2 if i else top
+        below = (merged[i + 1][0] - bottom) // 2 if i + 1 < len(merged) else binary.shape[0] - bottom
+        bands.append((top - min(pad, above), bottom + min(pad, below)))
+    return bands
+
+
+def split_line(dark_band, max_width=None):
+    """Tiles (left, right, own_left, own_right, glued) covering one line band, left to right
+
+    Tiles are cut, in order of preference:
+
+    - in the middle of a gap between words in the last half of the tile;
+    - between two letters, with glued set so the word is joined back up;
+    - through the text, with neighbouring tiles overlapping by
+      OVERLAP_HEIGHTS line heights.
+
+    A tile owns the words whose centre lies in [own_left, own_right). With
+    the overlap, a word up to that wide is whole in the tile that owns it,
+    so it is read once and never cut in two.
+    """
+    height = dark_band.shape[0]
+    text_height = max(int(dark_band.any(axis=1).sum()), 1)
+    columns = dark_band.any(axis=0)
+    inked = np.flatnonzero(columns)
+    if inked.size == 0:
+        return []
+    start, end = int(inked[0]), int(inked[-1]) + 1
+    half = OVERLAP_HEIGHTS * height // 2
+    max_width = max(max_width or MAX_TILE_HEIGHTS * height, 4 * half)
+    gaps = ink_runs(~columns[start:end], 0)
+    word_cuts = [start + (a + b) // 2 for a, b in gaps if b - a >= WORD_GAP * text_height]
+    letter_cuts = [start + (a + b) // 2 for a, b in gaps]
+
+    tiles, left, own_left = [], start, start
+    while end - own_left > max_width:
+        window = own_left + max_width // 2, own_left + max_width
+        words = [c for c in word_cuts if window[0] < c <= window[1]]
+        letters = [c for c in letter_cuts if window[0] < c <= window[1]]
+        if words or letters:
+            cut = (words or letters)[-1]
+            tiles.append((left, cut, own_left, cut, not words))
+            left = cut
+        else:
+            cut = own_left + max_width - half
+            tiles.append((left, cut + half, own_left, cut, False))
+            left = cut - half
+        own_left = cut
+    tiles.append((left, end, own_left, end, False))
+    return tiles
+
+
+def segment(binary, max_width=None):
+    """Tiles in reading order as (line, (left, top, right, bottom), own_left, own_right, glued)"""
+    tiles = []
+    for line, (top, bottom) in enumerate(find_lines(binary)):
+        for left, right, own_left, own_right, glued in split_line(binary[top:bottom] == 0, max_width):
+            tiles.append((line, (left, top, right, bottom), own_left, own_right, glued))
+    return tiles
+
+
+def join_words(tile_words):
+    """One line of text from its tiles' (owned words, glued) in left-to-right order"""
+    words, glue = [], False
+    for owned, glued in tile_words:
+        texts = [text for _, text in sorted(owned)]
+        if glue and words and texts:
+            words[-1] += texts.pop(0)
+        words.extend(texts)
+        glue = glued
+    return " ".join(words)
+
+
+def ocr_tiles(job):
+    """Recognise a batch of tiles with one tesseract process; runs in a worker process
+
+    Returns, per tile, the words whose centre the tile owns as (x, text).
+    """
+    crops, lang, tessdata_dir, psm = job
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, (crop, _, _, _) in enumerate(crops):
+            path = os.path.join(tmp, f"{i}.png")
+            Image.fromarray(np.pad(crop, TILE_BORDER, constant_values=255)).save(path)
+            paths.append(path)
+        pages = ocr_words(paths, lang=lang, tessdata_dir=tessdata_dir, psm=psm)
+    owned = []
+    for (_, left, own_left, own_right), words in zip(crops, pages):
+        centres = [(left - TILE_BORDER + x + w / 2, text) for x, _, w, _, _, text in words]
+        owned.append([(centre, text) for centre, text in centres if own_left <= centre < own_right])
+    return owned
+
+
+def ocr_large_image(img, lang=LANG, tessdata_dir=TESSDATA_DIR, psm=PSM, jobs=None, method="sauvola",
+                    tiles_per_batch=TILES_PER_BATCH, max_width=None):
+    """Recognise a large scan by OCRing its lines and tiles in parallel; return (text, stats)
+
+    The image is binarized and deskewed, cut into line tiles, and the tiles
+    are spread over a process pool in batches. Words come back with their
+    position and are put back in reading order: line by line, left to right.
+    Latency on a big scan falls with the number of workers.
+    """
+    start = time.perf_counter()
+    binary = np.asarray(preprocess_image(img, method, crop=False))
+    tiles = segment(binary, max_width)
+    segmented = time.perf_counter()
+
+    crops = [
+        (np.ascontiguousarray(binary[top:bottom, left:right]), left, own_left, own_right)
+        for _, (left, top, right, bottom), own_left, own_right, _ in tiles
+    ]
+    batches = [crops[i:i + tiles_per_batch] for i in range(0, len(crops), tiles_per_batch)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(ocr_tiles, [(batch, lang, tessdata_dir, psm) for batch in batches])
+        owned = [words for batch in results for words in batch]
+    lines = {}
+    for (line, _, _, _, glued), words in zip(tiles, owned):
+        lines.setdefault(line, []).append((words, glued))
+    text = "\n".join(join_words(lines[line]) for line in sorted(lines))
+
+    stats = {
+        "lines": len(lines),
+        "tiles": len(tiles),
+        "batches": len(batches),
+        "segment_seconds": segmented - start,
+        "ocr_seconds": time.perf_counter() - segmented,
+    }
+    return text, stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OCR a large scan by recognising its lines and tiles in parallel")
+    parser.add_argument('image', help="Photo or scan of the binary wall")
+    parser.add_argument('--lang', default=LANG, help=f"Model to use (default: {LANG})")
+    parser.add_argument('--tessdata-dir', default=TESSDATA_DIR, help=f"Folder with the model (default: {TESSDATA_DIR})")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--method', choices=["sauvola", "otsu"], default="sauvola", help="Binarization (default: sauvola)")
+    parser.add_argument('--tiles-per-batch', type=int, default=TILES_PER_BATCH,
+                        help=f"Tiles per tesseract process (default: {TILES_PER_BATCH})")
+    parser.add_argument('--max-width', type=int, help=f"Widest tile in pixels (default: {MAX_TILE_HEIGHTS} line heights)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with Image.open(args.image) as source:
+        text, stats = ocr_large_image(source, args.lang, args.tessdata_dir, jobs=args.jobs, method=args.method,
+                                      tiles_per_batch=args.tiles_per_batch, max_width=args.max_width)
+    print(text)
+    print(f"\n{stats['lines']} lines in {stats['tiles']} tiles ({stats['batches']} batches): "
+          f"segmented in {stats['segment_seconds']:.2f}s, recognised in {stats['ocr_seconds']:.2f}s")
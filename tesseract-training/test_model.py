@@ -1,27 +1,58 @@
 import pytesseract
 from PIL import Image
 import os
+import re
+import json
+import time
+import argparse
+import tempfile
+import tracing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from generate_training_data import TRAINING_TEXTS, find_font_files, font_slug, render_text_image
+from ocr_pipe import ocr_files, ocr_image
+from preprocess import preprocess_image
+from train_model import IMAGES_DIR, find_training_images
+
+RESULTS_DIR = "results"
+
+# Models compared by the evaluation runner: (lang, tessdata dir or None for the system one)
+EVAL_MODELS = [("eng", None), ("gillsans", "tessdata")]
+
+# Images recognised per tesseract process; the model is loaded once per batch
+EVAL_BATCH_SIZE = 16
+
+# Samples never used for training, rendered for --held-out evaluation
+HELD_OUT_TEXTS = [
+    "01010111 01101001 01101100 01101100",
+    "Pack my box with five dozen liquor jugs",
+    "10110010 00011101 11100100 01011011",
+    "Sphinx of black quartz, judge my vow 42",
+]
+HELD_OUT_DIR = os.path.join(RESULTS_DIR, "held_out")
+
 
 def test_trained_model():
     """Test the trained Gill Sans model"""
-    
+
     # Set path to tessdata directory
     tessdata_dir = os.path.abspath("tessdata")
-    
+
     # Configure pytesseract
     custom_config = f'--tessdata-dir "{tessdata_dir}" -l gillsans --psm 6'
-    
-    # Test with training images
-    test_images = ["training_images/gillsans.exp0.24.tif"]  # Add more test images
-    
+
+    # Test with the first sample of every font at 24px
+    test_images = [f for f in find_training_images() if f.endswith(".exp0.24.tif")]
+    if not test_images:
+        print(f"No test images found in {IMAGES_DIR}. Run generate_training_data.py first.")
+
     for image_path in test_images:
         if os.path.exists(image_path):
             print(f"\nTesting with: {image_path}")
-            
+
             # Test with default English model
             text_eng = pytesseract.image_to_string(Image.open(image_path), lang='eng')
             print(f"Default English model result: {text_eng.strip()}")
-            
+
             # Test with custom Gill Sans model
             try:
                 text_custom = pytesseract.image_to_string(Image.open(image_path), config=custom_config)
@@ -31,5 +62,217 @@ def test_trained_model():
         else:
             print(f"Test image not found: {image_path}")
 
+
+def test_in_memory(font_files=None, texts=None, sizes=(24,), output_path=None):
+    """Render samples and OCR them through tesseract's stdin, without writing any images
+
+    Only the results JSON is written.
+    """
+    texts = texts or TRAINING_TEXTS
+    font_files = font_files or find_font_files()
+    if not font_files:
+        print("No OTF font files found in training folders")
+        return []
+
+    output_path = output_path or os.path.join(RESULTS_DIR, "in_memory_results.json")
+    results = []
+    for font_path in font_files:
+        for size in sizes:
+            for index, text in enumerate(texts):
+                img = render_text_image(font_path, text, size)
+                result = {"font": font_slug(font_path), "size": size, "text": index, "expected": text}
+                for lang, tessdata_dir in (("eng", None), ("gillsans", "tessdata")):
+                    try:
+                        result[lang] = ocr_image(img, lang=lang, tessdata_dir=tessdata_dir)
+                    except RuntimeError as e:
+                        result[lang] = None
+                        result[f"{lang}_error"] = str(e)
+                results.append(result)
+                print(f"{result['font']} {size}px #{index}: eng={result['eng']!r} gillsans={result['gillsans']!r}")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1)
+
+    for lang in ("eng", "gillsans"):
+        exact = sum(1 for r in results if r[lang] == r["expected"])
+        print(f"{lang}: {exact}/{len(results)} exact matches")
+    print(f"Results written to {output_path}")
+    return results
+
+
+def expected_text(image_path, texts=TRAINING_TEXTS):
+    """Sample text an image was rendered from, using the exp<index> in its name
+
+    Augmented copies (exp<index>a<copy>) map to the same text.
+    """
+    match = re.search(r'\.exp(\d+)(?:a\d+)?\.', os.path.basename(image_path))
+    if match and int(match.group(1)) < len(texts):
+        return texts[int(match.group(1))]
+    return None
+
+
+def character_accuracy(expected, actual):
+    """1 - edit distance / expected length, floored at 0"""
+    if not expected:
+        return float(not actual)
+    previous = list(range(len(actual) + 1))
+    for i, a in enumerate(expected, 1):
+        current = [i]
+        for j, b in enumerate(actual, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a != b)))
+        previous = current
+    return max(0.0, 1 - previous[-1] / len(expected))
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def render_held_out(font_files=None, sizes=(24,), texts=HELD_OUT_TEXTS, output_dir=HELD_OUT_DIR):
+    """Render the held-out samples; return [(image path, expected text)]"""
+    font_files = font_files or find_font_files()
+    os.makedirs(output_dir, exist_ok=True)
+    samples = []
+    for font_path in font_files:
+        for size in sizes:
+            for index, text in enumerate(texts):
+                path = os.path.join(output_dir, f"heldout.{font_slug(font_path)}.exp{index}.{size}.tif")
+                render_text_image(font_path, text, size).save(path)
+                samples.append((path, text))
+    return samples
+
+
+def ocr_batch(job):
+    """OCR one batch of images with one model; runs in a worker process
+
+    With a preprocess method the images are cleaned up first, and that time
+    counts towards the batch's latency.
+    """
+    lang, tessdata_dir, paths, preprocess = job
+    start = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            inputs = paths
+            if preprocess:
+                inputs = [os.path.join(tmp, f"{i}.png") for i in range(len(paths))]
+                for path, cleaned in zip(paths, inputs):
+                    with Image.open(path) as img:
+                        preprocess_image(img, preprocess).save(cleaned)
+            texts, error = ocr_files(inputs, lang=lang, tessdata_dir=tessdata_dir), None
+    except (RuntimeError, OSError) as e:
+        texts, error = [None] * len(paths), str(e)
+    return lang, paths, texts, time.perf_counter() - start, error
+
+
+def evaluate_images(samples, models=EVAL_MODELS, jobs=None, batch_size=EVAL_BATCH_SIZE, output_path=None,
+                    preprocess=None):
+    """OCR every (image path, expected text) sample with every model across a process pool
+
+    Each worker runs one tesseract process per batch, so the model is loaded
+    once per batch_size images. Per-image latency is the batch time divided
+    by its size; use batch_size=1 to measure single-image latency including
+    the model load. preprocess names a preprocess.py method ("sauvola" or
+    "otsu") applied to each image first. Writes per-image results and a
+    summary per model to JSON.
+    """
+    output_path = output_path or os.path.join(RESULTS_DIR, "evaluation.json")
+    expected = dict(samples)
+    paths = list(expected)
+    batches = [
+        (lang, tessdata_dir, paths[i:i + batch_size], preprocess)
+        for lang, tessdata_dir in models
+        for i in range(0, len(paths), batch_size)
+    ]
+    print(f"Evaluating {len(paths)} images with {len(models)} model(s) in {len(batches)} batch(es)")
+
+    results = {lang: [] for lang, _ in models}
+    busy = {lang: 0.0 for lang, _ in models}
+    start = time.perf_counter()
+    span = tracing.span("evaluate", "stage", models=",".join(lang for lang, _ in models), images=len(paths))
+    with span, ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(ocr_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            lang, batch_paths, texts, elapsed, error = future.result()
+            busy[lang] += elapsed
+            if error:
+                print(f"{lang}: batch of {len(batch_paths)} failed: {error}")
+            for path, text in zip(batch_paths, texts):
+                result = {"image": path, "expected": expected[path], "text": text, "latency": elapsed / len(batch_paths),
+                          "accuracy": None}
+                if text is not None and expected[path] is not None:
+                    result["accuracy"] = character_accuracy(expected[path], text)
+                    result["exact"] = text == expected[path]
+                results[lang].append(result)
+    wall = time.perf_counter() - start
+
+    summary = {}
+    for lang, images in results.items():
+        scored = [r for r in images if r["accuracy"] is not None]
+        latencies = [r["latency"] for r in images if r["text"] is not None]
+        summary[lang] = {
+            "images": len(images),
+            "failed": sum(1 for r in images if r["text"] is None),
+            "accuracy": sum(r["accuracy"] for r in scored) / len(scored) if scored else None,
+            "exact": sum(1 for r in scored if r["exact"]),
+            # Process time spent on this model; models share the pool, so wall time isn't per model
+            "images_per_second": len(latencies) / busy[lang] if busy[lang] else 0.0,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+        }
+        images.sort(key=lambda r: r["image"])
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"wall_seconds": wall, "batch_size": batch_size, "preprocess": preprocess, "summary": summary, "images": results}, f, indent=1)
+
+    print(f"\n{'model':10} {'images':>6} {'accuracy':>9} {'exact':>6} {'img/s':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for lang, stats in summary.items():
+        accuracy = f"{stats['accuracy']:.2%}" if stats['accuracy'] is not None else "n/a"
+        print(f"{lang:10} {stats['images']:6} {accuracy:>9} {stats['exact']:6} {stats['images_per_second']:7.1f} "
+              f"{stats['latency_p50'] * 1000:8.1f} {stats['latency_p95'] * 1000:8.1f}")
+    print(f"{len(paths) * len(models)} recognitions in {wall:.1f}s; results written to {output_path}")
+    return summary
+
+
+def evaluation_samples(images_dir=IMAGES_DIR, held_out=False, font_files=None, sizes=(24,)):
+    """(image path, expected text) pairs from the training images or a fresh held-out render"""
+    if held_out:
+        return render_held_out(font_files, sizes)
+    # Multi-page batch TIFFs would yield several pages per list entry, so only single images are used
+    return [(path, expected_text(path)) for path in find_training_images(images_dir)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Test the trained Gill Sans model against the English model")
+    parser.add_argument('--in-memory', action='store_true',
+                        help="Render samples and pipe them straight into tesseract instead of reading training_images")
+    parser.add_argument('--fonts', nargs='+', help="Fonts to render in --in-memory or --held-out mode (default: every training font)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[24], help="Sizes to render in --in-memory or --held-out mode")
+    parser.add_argument('--output', help="Results JSON for --in-memory or --evaluate mode")
+    parser.add_argument('--evaluate', action='store_true',
+                        help="Sweep every training image through eng and gillsans and report accuracy and speed")
+    parser.add_argument('--held-out', action='store_true', help="With --evaluate, render and score held-out samples instead")
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help=f"Images for --evaluate (default: {IMAGES_DIR})")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes for --evaluate (default: one per CPU)")
+    parser.add_argument('--batch-size', type=int, default=EVAL_BATCH_SIZE,
+                        help=f"Images per tesseract process in --evaluate mode (default: {EVAL_BATCH_SIZE})")
+    parser.add_argument('--preprocess', choices=["sauvola", "otsu"],
+                        help="With --evaluate, binarize, denoise, deskew and crop each image before OCR")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    test_trained_model()
+    args = parse_args()
+    if args.evaluate:
+        samples = evaluation_samples(args.images_dir, args.held_out, args.fonts, args.sizes)
+        evaluate_images(samples, jobs=args.jobs, batch_size=args.batch_size, output_path=args.output,
+                        preprocess=args.preprocess)
+    elif args.in_memory:
+        test_in_memory(font_files=args.fonts, sizes=args.sizes, output_path=args.output)
+    else:
+        test_trained_model()
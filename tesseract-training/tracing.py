@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Folder collecting the spans of a traced run; set in the environment so worker processes record too
+TRACE_DIR_ENV = "TRAINING_TRACE_DIR"
+
+# Span arguments that get their own breakdown in the summary
+SUMMARY_KEYS = ["font", "size", "step"]
+SUMMARY_ROWS = 15
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_lock = threading.Lock()
+_file = None
+_file_pid = None
+
+
+def enabled():
+    return TRACE_DIR_ENV in os.environ
+
+
+def enable():
+    """Start recording spans in this process and every worker process started after this"""
+    if not enabled():
+        os.environ[TRACE_DIR_ENV] = tempfile.mkdtemp(prefix="training-trace-")
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+def _write(event):
+    """Append one event to this process's part of the trace"""
+    global _file, _file_pid
+    with _lock:
+        # Forked workers inherit the parent's file object; each process writes its own part
+        if _file is None or _file_pid != os.getpid():
+            _file_pid = os.getpid()
+            path = os.path.join(os.environ[TRACE_DIR_ENV], f"{_file_pid}.jsonl")
+            _file = open(path, "a", encoding="utf-8", buffering=1)
+        _file.write(json.dumps(event) + "\n")
+
+
+def _output_bytes(outputs):
+    return sum(os.path.getsize(p) for p in outputs if os.path.isfile(p))
+
+
+@contextmanager
+def span(name, category="stage", outputs=(), **args):
+    """Record a block as one span: wall time, CPU time, peak RSS and bytes written
+
+    CPU time is the calling thread's. Peak RSS is the process's high-water
+    mark when the span ends. Bytes written is the size of the given output
+    files afterwards. Yields the span's args, so details found inside the
+    block can be added. Does nothing unless tracing is enabled.
+    """
+    if not enabled():
+        yield args
+        return
+    start = time.perf_counter_ns()
+    cpu = time.thread_time_ns()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        end = time.perf_counter_ns()
+        args["cpu_ms"] = round((time.thread_time_ns() - cpu) / 1e6, 3)
+        args.setdefault("peak_rss", _peak_rss())
+        if outputs:
+            args["bytes_written"] = _output_bytes(outputs)
+        _write({"name": name, "cat": category, "ph": "X", "ts": start / 1000, "dur": (end - start) / 1000,
+                "pid": os.getpid(), "tid": threading.get_native_id(), "args": args})
+
+
+class _RusagePopen(subprocess.Popen):
+    """Popen that keeps the child's resource usage, which os.wait4 returns when reaping it"""
+
+    rusage = None
+
+    # _try_wait is a CPython internal: the POSIX Popen reaps its child through it with os.waitpid.
+    # If another version stops calling it, rusage stays None and spans just lack the child's figures.
+    def _try_wait(self, wait_flags):
+        try:
+            pid, status, rusage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0
+        if pid:
+            self.rusage = rusage
+        return pid, status
+
+
+def run(command, name=None, category="subprocess", outputs=(), input=None, capture_output=False, timeout=None,
+        check=False, span_args=None, **kwargs):
+    """subprocess.run() recorded as a span with the child's own CPU time and peak RSS
+
+    Takes the same arguments as subprocess.run(), and behaves exactly like it
+    when tracing is off. name defaults to the program's file name. On Linux
+    the child's peak RSS counts the parent's memory it was forked with, so
+    it is never below the caller's own.
+    """
+    if not enabled():
+        return subprocess.run(command, input=input, capture_output=capture_output, timeout=timeout, check=check,
+                              **kwargs)
+    if name is None:
+        program = command.split()[0] if isinstance(command, str) else command[0]
+        name = os.path.basename(program)
+    if capture_output:
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    popen = _RusagePopen if hasattr(os, "wait4") else subprocess.Popen
+    with span(name, category, outputs, command=subprocess.list2cmdline(command) if not isinstance(command, str)
+              else command, **(span_args or {})) as args:
+        with popen(command, **kwargs) as process:
+            try:
+                stdout, stderr = process.communicate(input, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+        args["returncode"] = process.returncode
+        rusage = getattr(process, "rusage", None)
+        if rusage is not None:
+            args["child_cpu_ms"] = round((rusage.ru_utime + rusage.ru_stime) * 1000, 3)
+            args["peak_rss"] = rusage.ru_maxrss * _RSS_UNIT
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args, stdout, stderr)
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+def collect():
+    """Every span recorded so far, from this process and its workers, in start order"""
+    events = []
+    for path in glob.glob(os.path.join(os.environ.get(TRACE_DIR_ENV, ""), "*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    pass  # A worker killed mid-write
+    return sorted(events, key=lambda e: e["ts"])
+
+
+def chrome_trace(events):
+    """Chrome trace / Perfetto JSON for a list of spans, with one named track per process"""
+    if not events:
+        return {"traceEvents": [], "displayTimeUnit": "ms"}
+    origin = min(e["ts"] for e in events)
+    main_pid = os.getpid()
+    trace = [dict(e, ts=round(e["ts"] - origin, 3), dur=round(e["dur"], 3)) for e in events]
+    for pid in sorted({e["pid"] for e in events}):
+        name = "main" if pid == main_pid else f"worker {pid}"
+        trace.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def _table(title, rows):
+    """Print rows of (label, spans) as a table of totals, largest total first"""
+    print(f"\n{title}")
+    print(f"{'':<40} {'count':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'cpu s':>8} {'peak MB':>8} "
+          f"{'written MB':>10}")
+    totals = []
+    for label, spans in rows.items():
+        wall = sum(e["dur"] for e in spans) / 1e6
+        cpu = sum(e["args"].get("child_cpu_ms", e["args"].get("cpu_ms", 0)) for e in spans) / 1000
+        peaks = [e["args"]["peak_rss"] for e in spans if e["args"].get("peak_rss")]
+        written = sum(e["args"].get("bytes_written", 0) for e in spans)
+        totals.append((wall, label, len(spans), max(e["dur"] for e in spans) / 1000, cpu,
+                       max(peaks) / 2**20 if peaks else 0, written / 2**20))
+    totals.sort(reverse=True)
+    for wall, label, count, longest, cpu, peak, written in totals[:SUMMARY_ROWS]:
+        print(f"{str(label)[:40]:<40} {count:>6} {wall:>9.2f} {wall * 1000 / count:>9.1f} {longest:>9.1f} "
+              f"{cpu:>8.2f} {peak:>8.1f} {written:>10.2f}")
+    if len(totals) > SUMMARY_ROWS:
+        print(f"... and {len(totals) - SUMMARY_ROWS} more")
+
+
+def print_summary(events):
+    """Totals per span name, then per font, size and step, so the costliest work stands out
+
+    CPU is the child's for subprocess spans and the thread's otherwise.
+    Span times overlap when work runs in parallel, so totals can exceed the
+    run's wall time.
+    """
+    if not events:
+        print("No spans recorded")
+        return
+    by_name = {}
+    for e in events:
+        by_name.setdefault(f"{e['cat']}: {e['name']}", []).append(e)
+    _table("Time by span", by_name)
+    for key in SUMMARY_KEYS:
+        groups = {}
+        for e in events:
+            if key in e["args"]:
+                groups.setdefault(f"{e['name']} {key}={e['args'][key]}", []).append(e)
+        if groups:
+            _table(f"Time by {key}", groups)
+
+
+def finish(output_path):
+    """Write everything recorded to output_path as a Chrome trace, print the summary and stop tracing"""
+    global _file
+    if not enabled():
+        return
+    events = collect()
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(events), f)
+    print_summary(events)
+    print(f"\nTrace with {len(events)} spans written to {output_path} (open in https://ui.perfetto.dev)")
+    with _lock:
+        if _file is not None:
+            _file.close()
+            _file = None
+    shutil.rmtree(os.environ.pop(TRACE_DIR_ENV), ignore_errors=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Print the summary tables of a trace written with --trace")
+    parser.add_argument('trace', help="Chrome trace JSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(args.trace, encoding="utf-8") as f:
+        print_summary([e for e in json.load(f)["traceEvents"] if e.get("ph") == "X"])
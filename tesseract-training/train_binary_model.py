@@ -0,0 +1,196 @@
+import os
+import random
+import argparse
+from difflib import SequenceMatcher
+from benchmark_model import measure_load_time
+from generate_training_data import FONT_SIZES, generate_training_images
+from ocr_pipe import ocr_files
+from test_model import RESULTS_DIR, render_held_out
+from train_model import LANG, MODEL_PATH, prepare_training_images, run_command, train_from_images
+
+BINARY_LANG = "gillsansbin"
+BINARY_IMAGES_DIR = "training_images_binary"
+BINARY_MODEL_PATH = f"tessdata/{BINARY_LANG}.traineddata"
+WORKSPACE = os.path.join("variants", "binary")
+
+# Kept apart from train_model.py's manifest so both can train at once without overwriting each other's entries
+BINARY_MODEL_MANIFEST = "tessdata/.binary_model_manifest.json"
+
+# Training lines of 8-bit groups, like the binary wall
+BINARY_LINES = 24
+GROUPS_PER_LINE = 6
+
+# Letters and marks that look like 0 or 1; trained under their own labels so they aren't read as bits
+CONFUSABLES = "OoDQlI|!"
+NEGATIVE_LINES = 6
+
+# Lines rendered to check that confusables aren't read as bits
+EVAL_LINES = 4
+EVAL_DIR = os.path.join(RESULTS_DIR, "binary_confusables")
+
+
+def binary_training_texts(count=BINARY_LINES, groups=GROUPS_PER_LINE, seed=0):
+    """Lines of 8-bit groups that only use 0, 1 and space
+
+    Random printable bytes make up most lines. The first few are long runs and
+    alternations, which are where 0/1 spacing is hardest to read.
+    """
+    rng = random.Random(seed)
+    fixed = [
+        " ".join(["00000000", "11111111"] * (groups // 2)),
+        " ".join(["01010101", "10101010"] * (groups // 2)),
+        " ".join(["00110011", "11001100"] * (groups // 2)),
+        " ".join(["00011110", "11100001"] * (groups // 2)),
+    ]
+    random_lines = [
+        " ".join(format(rng.randrange(32, 127), "08b") for _ in range(groups))
+        for _ in range(max(count - len(fixed), 0))
+    ]
+    return (fixed + random_lines)[:count]
+
+
+def confusable_texts(count=NEGATIVE_LINES, groups=GROUPS_PER_LINE, seed=1):
+    """Lines of 8-character groups that mix 0 and 1 with the shapes they are mistaken for
+
+    Every group holds at least one confusable, so each one is drawn right
+    next to real 0s and 1s in the same font and size.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        line = []
+        for _ in range(groups):
+            group = [rng.choice("01") for _ in range(8)]
+            for i in rng.sample(range(8), rng.randint(1, 3)):
+                group[i] = rng.choice(CONFUSABLES)
+            line.append("".join(group))
+        lines.append(" ".join(line))
+    return lines
+
+
+def unicharset_size(workspace):
+    """Characters in the workspace's unicharset, or None if it hasn't been built"""
+    path = os.path.join(workspace, f"{LANG}.unicharset")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return int(f.readline())
+
+
+def compared_models():
+    """The general model from train_model.py next to the binary one"""
+    return [
+        ("general", MODEL_PATH, unicharset_size(".")),
+        ("binary", BINARY_MODEL_PATH, unicharset_size(WORKSPACE)),
+    ]
+
+
+def report_models(models):
+    """Print size and load time of each (label, model path, unicharset size)"""
+    print(f"\n{'model':10} {'size KB':>8} {'chars':>6} {'load ms':>8}")
+    for label, path, chars in models:
+        if not os.path.exists(path):
+            print(f"{label:10} not built ({path})")
+            continue
+        size = os.path.getsize(path) / 1024
+        tessdata_dir, name = os.path.split(path)
+        try:
+            load = f"{measure_load_time(os.path.splitext(name)[0], tessdata_dir) * 1000:8.1f}"
+        except (RuntimeError, OSError) as e:
+            load = f"{'n/a':>8}  ({e})"
+        print(f"{label:10} {size:8.1f} {chars if chars is not None else '?':>6} {load}")
+
+
+def check_confusables(font_files=None, sizes=(24,), model_path=BINARY_MODEL_PATH):
+    """Render unseen lines of confusables and count how often the model reads one as a bit
+
+    Expected and recognised text are aligned character by character; a
+    confusable is rejected when it comes out as anything but 0 or 1.
+    Returns {"confusables", "read_as_bits", "bits", "bits_correct"}, or None
+    if the model or tesseract isn't available.
+    """
+    if not os.path.exists(model_path):
+        print(f"Model not built: {model_path}")
+        return None
+    samples = render_held_out(font_files, sizes, confusable_texts(EVAL_LINES, seed=2), EVAL_DIR)
+    tessdata_dir, name = os.path.split(model_path)
+    try:
+        texts = ocr_files([path for path, _ in samples], lang=os.path.splitext(name)[0], tessdata_dir=tessdata_dir)
+    except (RuntimeError, OSError) as e:
+        print(f"Could not check confusables: {e}")
+        return None
+
+    counts = {"confusables": 0, "read_as_bits": 0, "bits": 0, "bits_correct": 0}
+    for (_, expected), text in zip(samples, texts):
+        read = dict.fromkeys(range(len(expected)))
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, expected, text, autojunk=False).get_opcodes():
+            if tag in ("equal", "replace"):
+                read.update(zip(range(i1, i2), text[j1:j2]))
+        for i, char in enumerate(expected):
+            if char in CONFUSABLES:
+                counts["confusables"] += 1
+                counts["read_as_bits"] += read[i] in ("0", "1")
+            elif char in "01":
+                counts["bits"] += 1
+                counts["bits_correct"] += read[i] == char
+
+    print(f"\nConfusables read as bits: {counts['read_as_bits']} of {counts['confusables']}; "
+          f"bits read correctly: {counts['bits_correct']} of {counts['bits']}")
+    return counts
+
+
+def train_binary_model(font_files=None, sizes=None, count=BINARY_LINES, jobs=None, force=False):
+    """Train a model for 0, 1 and space that rejects the shapes mistaken for them
+
+    Images are rendered in the batch layout, so box labels come from the
+    rendered text rather than from makebox with eng. makebox would label
+    thin 1s and round 0s as l, I or O. Besides the 8-bit groups, the model
+    is trained on CONFUSABLES under their own labels, so an O or l beside
+    the wall is read as a letter instead of a bit. check_confusables then
+    measures how often that still goes wrong.
+    """
+    if not run_command(["tesseract", "--version"]):
+        print("Tesseract not found. Please install Tesseract OCR with training tools.")
+        return False
+
+    texts = binary_training_texts(count) + confusable_texts()
+    generate_training_images(font_files=font_files, texts=texts, sizes=sizes or FONT_SIZES, jobs=jobs,
+                             output_dir=BINARY_IMAGES_DIR, force=force, layout="batch")
+
+    trained, digests = prepare_training_images(BINARY_IMAGES_DIR, jobs, force, layout="batch")
+    if not trained:
+        print("No images were processed successfully. Stopping.")
+        return False
+
+    ok = train_from_images(trained, digests, WORKSPACE, BINARY_MODEL_PATH, force=force, label="binary",
+                           manifest_path=BINARY_MODEL_MANIFEST)
+    report_models(compared_models())
+    if ok:
+        check_confusables(font_files)
+    print(f"\nUse it with: --tessdata-dir tessdata -l {BINARY_LANG}")
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train a compact model that only recognises 0, 1 and space")
+    parser.add_argument('--fonts', nargs='+', help="Font files to render (default: every OTF in the training folder)")
+    parser.add_argument('--sizes', nargs='+', type=int, help=f"Font sizes (default: {' '.join(map(str, FONT_SIZES))})")
+    parser.add_argument('--lines', type=int, default=BINARY_LINES,
+                        help=f"Lines of binary groups rendered per font and size (default: {BINARY_LINES})")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Re-render and retrain even if inputs are unchanged")
+    parser.add_argument('--report', action='store_true', help="Only print model sizes and load times")
+    parser.add_argument('--check', action='store_true',
+                        help="Only check how often the trained model reads confusable letters as 0 or 1")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.report:
+        report_models(compared_models())
+    elif args.check:
+        check_confusables(args.fonts)
+    else:
+        train_binary_model(font_files=args.fonts, sizes=args.sizes, count=args.lines, jobs=args.jobs,
+                           force=args.force)
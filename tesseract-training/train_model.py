@@ -1,82 +1,347 @@
 import subprocess
 import os
+import re
 import glob
+import time
+import argparse
+import tracing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from build_cache import BuildManifest, hash_file, hash_inputs, tesseract_version
 
-def run_command(command):
-    """Execute shell command and handle errors"""
-    print(f"Running: {command}")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
+LANG = "gillsans"
+IMAGES_DIR = "training_images"
+MODEL_PATH = f"tessdata/{LANG}.traineddata"
+
+# Bump when the makebox/box.train or clustering commands change
+BOX_VERSION = 1
+MODEL_VERSION = 2
+BOX_MANIFEST = ".train_manifest.json"
+MODEL_MANIFEST = "tessdata/.model_manifest.json"
+
+# Names written by generate_training_data.py (and augment_training_data.py):
+# <lang>.<font>.exp<n>[a<copy>].<size>.tif, or <lang>.<font>.batch.tif
+TRAINING_IMAGE_NAME = re.compile(rf"^{re.escape(LANG)}\.[a-z0-9]+\.(exp\d+(a\d+)?\.\d+|batch)\.tif$")
+
+# Files Steps 3-7 write in the workspace, cleared before each training run
+TRAINING_INTERMEDIATES = ["unicharset", f"{LANG}.unicharset", f"{LANG}.traineddata"] + [
+    name for base in ("inttemp", "normproto", "pffmtable", "shapetable") for name in (base, f"{LANG}.{base}")
+]
+
+
+def format_command(command):
+    """Printable form of a command given as an argument list"""
+    if isinstance(command, str):
+        return command
+    return subprocess.list2cmdline(command)
+
+
+def prefix(label):
+    """Log prefix identifying which variant a line belongs to"""
+    return f"[{label}] " if label else ""
+
+
+def run_command(command, cwd=None, label=None, step=None):
+    """Execute a command and handle errors; step names it in the trace"""
+    print(f"{prefix(label)}Running: {format_command(command)}")
+    start = time.perf_counter()
+    try:
+        result = tracing.run(command, shell=isinstance(command, str), cwd=cwd, capture_output=True, text=True,
+                             span_args={"step": step} if step else None)
+    except FileNotFoundError as e:
+        print(f"{prefix(label)}Error: {e}")
+        return False
+    elapsed = time.perf_counter() - start
     if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+        print(f"{prefix(label)}Error after {elapsed:.2f}s: {result.stderr}")
         return False
-    print(f"Success: {result.stdout}")
+    print(f"{prefix(label)}Success in {elapsed:.2f}s: {result.stdout}")
     return True
 
-def train_tesseract_model():
-    """Train custom Tesseract model for Gill Sans font"""
-    
+
+def run_tool(command, step=None, outputs=(), **tags):
+    """Run a command quietly; return an error message, or None on success
+
+    step, outputs and tags (font, size) describe the run in the trace.
+    """
+    try:
+        result = tracing.run(command, capture_output=True, text=True, outputs=outputs,
+                             span_args=dict(tags, step=step) if step else tags)
+    except FileNotFoundError as e:
+        return str(e)
+    if result.returncode != 0:
+        return f"{format_command(command)} exited with {result.returncode}: {result.stderr.strip()}"
+    return None
+
+
+def font_name_from_image(image_file):
+    """Tesseract reads the font from <lang>.<font>.exp<n>... file names"""
+    return os.path.basename(image_file).split('.')[1]
+
+
+def image_tags(image_file):
+    """Font and size of a rendered image, from <lang>.<font>.exp<n>.<size>.tif, for the trace"""
+    parts = os.path.basename(image_file).split('.')
+    tags = {"font": parts[1]}
+    if len(parts) == 5 and parts[3].isdigit():
+        tags["size"] = int(parts[3])
+    return tags
+
+
+def write_font_properties(image_files, path="font_properties"):
+    """Write one font_properties line per font: <font> italic bold fixed serif fraktur"""
+    fonts = sorted({font_name_from_image(f) for f in image_files})
+    with open(path, "w") as f:
+        for font in fonts:
+            italic = int("italic" in font)
+            bold = int("bold" in font or "heavy" in font)
+            f.write(f"{font} {italic} {bold} 0 0 0\n")
+    return fonts
+
+
+def is_batch_image(image_file):
+    """Multi-page batches from generate_training_data.py --layout batch"""
+    return image_file.endswith(".batch.tif")
+
+
+def process_training_image(image_file):
+    """Steps 1-2 for one image: makebox then box.train; return an error message or None
+
+    Batch TIFFs already come with a rendered .box file, so only box.train runs.
+    """
+    base = os.path.splitext(image_file)[0]
+    tags = image_tags(image_file)
+
+    with tracing.span("box", "image", image=os.path.basename(image_file), **tags) as span:
+        # Step 1: Generate box file
+        if not is_batch_image(image_file):
+            error = run_tool(["tesseract", image_file, base, "-l", "eng", "--psm", "6", "batch.nochop", "makebox"],
+                             "makebox", [base + ".box"], **tags)
+            if error:
+                span["error"] = error
+                return f"makebox: {error}"
+
+        # Step 2: Generate .tr file
+        error = run_tool(["tesseract", image_file, base, "-l", "eng", "--psm", "6", "box.train"],
+                         "box.train", [base + ".tr"], **tags)
+        if error:
+            span["error"] = error
+            return f"box.train: {error}"
+    return None
+
+
+def process_training_images(image_files, jobs=None):
+    """Run Steps 1-2 for every image on a bounded worker pool; return {image: error}"""
+    failures = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {executor.submit(process_training_image, f): f for f in image_files}
+        for done, future in enumerate(as_completed(futures), 1):
+            image_file = futures[future]
+            error = future.result()
+            if error:
+                failures[image_file] = error
+            print(f"[{done}/{len(image_files)}] {'FAILED' if error else 'OK'}: {image_file}")
+    return failures
+
+
+def box_digest(image_file):
+    """Digest of everything that determines an image's .box and .tr files"""
+    if is_batch_image(image_file):
+        box_file = os.path.splitext(image_file)[0] + ".box"
+        return hash_inputs("batch", BOX_VERSION, hash_file(image_file), hash_file(box_file), tesseract_version())
+    return hash_inputs("box", BOX_VERSION, hash_file(image_file), tesseract_version())
+
+
+def model_outputs(workspace, output_path):
+    """Files written by Steps 3-8"""
+    names = ["font_properties", f"{LANG}.unicharset"] + [
+        f"{LANG}.{name}" for name in ("inttemp", "normproto", "pffmtable", "shapetable")
+    ]
+    return [output_path] + [os.path.join(workspace, name) for name in names]
+
+
+def find_training_images(images_dir=IMAGES_DIR, layout="image"):
+    """Single-image TIFFs, or only the multi-page batch TIFFs for the batch layout
+
+    Only files named like rendered training images count, so stray TIFFs
+    can't turn into fonts in font_properties.
+    """
+    image_files = sorted(glob.glob(os.path.join(images_dir, "*.tif")))
+    image_files = [f for f in image_files if TRAINING_IMAGE_NAME.match(os.path.basename(f))]
+    return [f for f in image_files if is_batch_image(f) == (layout == "batch")]
+
+
+def prepare_training_images(images_dir=IMAGES_DIR, jobs=None, force=False, layout="image"):
+    """Steps 1-2 for every image in images_dir
+
+    Returns (trained, digests): the images whose box/tr files are ready, and
+    each image's box digest. Images whose inputs are unchanged are skipped.
+    """
+    image_files = find_training_images(images_dir, layout)
+    if not image_files:
+        print(f"No training images found in {images_dir}. Run generate_training_data.py first.")
+        return [], {}
+
+    manifest = BuildManifest(os.path.join(images_dir, BOX_MANIFEST))
+    digests = {f: box_digest(f) for f in image_files}
+    stale = [f for f in image_files if force or not manifest.is_fresh(os.path.basename(f), digests[f])]
+    if len(stale) < len(image_files):
+        print(f"Up to date: box and training files for {len(image_files) - len(stale)} image(s)")
+
+    # Steps 1-2: Box and .tr files, one image per worker
+    failures = {}
+    if stale:
+        print(f"Steps 1-2: Generating box and training files for {len(stale)} images...")
+        with tracing.span("box files", "stage", images=len(stale)):
+            failures = process_training_images(stale, jobs)
+        for image_file in stale:
+            key = os.path.basename(image_file)
+            if image_file in failures:
+                manifest.forget(key)
+            else:
+                base = os.path.splitext(image_file)[0]
+                manifest.record(key, digests[image_file], [base + ".box", base + ".tr"])
+        manifest.save()
+    if failures:
+        print(f"\n{len(failures)} of {len(image_files)} images failed:")
+        for image_file, error in sorted(failures.items()):
+            print(f"  - {image_file}: {error}")
+
+    trained = [f for f in image_files if f not in failures]
+    return trained, digests
+
+
+def train_from_images(trained, digests, workspace=".", output_path=MODEL_PATH, force=False, label=None,
+                      manifest_path=None):
+    """Steps 3-8: build a traineddata file from images that already have box/tr files
+
+    Every intermediate file is written inside workspace, so variants trained
+    in different workspaces can run at the same time. Skipped when the model's
+    inputs are unchanged, unless force is set. The model manifest defaults to
+    the one in the output folder; models trained alongside each other into
+    the same folder need their own manifest_path.
+    """
+    os.makedirs(workspace, exist_ok=True)
+    output_dir = os.path.dirname(output_path) or "."
+    os.makedirs(output_dir, exist_ok=True)
+
+    model_manifest = BuildManifest(manifest_path or os.path.join(output_dir, os.path.basename(MODEL_MANIFEST)))
+    model_digest = hash_inputs(
+        "model", MODEL_VERSION, tesseract_version(),
+        sorted((os.path.basename(f), digests[f]) for f in trained),
+    )
+    if not force and model_manifest.is_fresh(output_path, model_digest):
+        print(f"{prefix(label)}Model is up to date: {output_path}")
+        return True
+
+    # Steps 3-8 are one span in the trace, with each tool run inside it
+    with tracing.span("train", "stage", outputs=[output_path], label=label or LANG, images=len(trained)):
+        box_files = [os.path.abspath(os.path.splitext(f)[0] + ".box") for f in trained]
+        tr_files = [os.path.abspath(os.path.splitext(f)[0] + ".tr") for f in trained]
+
+        # A failed step must not leave the previous run's files for combine_tessdata to pack
+        for name in TRAINING_INTERMEDIATES:
+            path = os.path.join(workspace, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+        def failed(step):
+            print(f"{prefix(label)}Training failed at {step}. {output_path} was not updated.")
+            return False
+
+        # Step 3: Extract character features
+        print(f"{prefix(label)}Step 3: Extracting character features...")
+        if not run_command(["unicharset_extractor"] + box_files, cwd=workspace, label=label,
+                           step="unicharset_extractor"):
+            return failed("unicharset_extractor")
+
+        # Step 4: Create font properties file
+        write_font_properties(trained, os.path.join(workspace, "font_properties"))
+
+        # Step 5: Clustering
+        print(f"{prefix(label)}Step 5: Clustering...")
+        if not run_command(["mftraining", "-F", "font_properties", "-U", "unicharset", "-O", f"{LANG}.unicharset"]
+                           + tr_files, cwd=workspace, label=label, step="mftraining"):
+            return failed("mftraining")
+        if not run_command(["cntraining"] + tr_files, cwd=workspace, label=label, step="cntraining"):
+            return failed("cntraining")
+
+        # Step 6: Rename files
+        print(f"{prefix(label)}Step 6: Renaming files...")
+        files_to_rename = [
+            ("inttemp", f"{LANG}.inttemp"),
+            ("normproto", f"{LANG}.normproto"),
+            ("pffmtable", f"{LANG}.pffmtable"),
+            ("shapetable", f"{LANG}.shapetable")
+        ]
+
+        for old_name, new_name in files_to_rename:
+            old_path = os.path.join(workspace, old_name)
+            if os.path.exists(old_path):
+                os.replace(old_path, os.path.join(workspace, new_name))
+
+        # Step 7: Combine data files
+        print(f"{prefix(label)}Step 7: Combining data files...")
+        if not run_command(["combine_tessdata", f"{LANG}."], cwd=workspace, label=label, step="combine_tessdata"):
+            return failed("combine_tessdata")
+
+        # Step 8: Move trained data to its output location
+        combined = os.path.join(workspace, f"{LANG}.traineddata")
+        if os.path.exists(combined):
+            os.replace(combined, output_path)
+            outputs = [p for p in model_outputs(workspace, output_path) if os.path.exists(p)]
+            model_manifest.record(output_path, model_digest, outputs)
+            model_manifest.save()
+            print(f"{prefix(label)}Training completed! {output_path} created.")
+            return True
+        else:
+            print(f"{prefix(label)}Training failed. {LANG}.traineddata not created.")
+            return False
+
+
+def train_tesseract_model(jobs=None, images_dir=IMAGES_DIR, force=False, layout="image"):
+    """Train custom Tesseract model for Gill Sans font
+
+    layout="batch" trains from the per-font multi-page TIFFs, which needs one
+    box.train launch per font instead of two tesseract launches per image.
+
+    Images whose box/tr inputs are unchanged are not reprocessed, and Steps 3-8
+    are skipped when no image changed, unless force is set.
+    """
+
     # Check if tesseract training tools are installed
-    if not run_command("tesseract --version"):
+    if not run_command(["tesseract", "--version"]):
         print("Tesseract not found. Please install Tesseract OCR with training tools.")
-        return
-    
+        return False
+
     # Create necessary directories
     os.makedirs("tessdata", exist_ok=True)
-    
-    # Step 1: Generate box files for each training image
-    print("Step 1: Generating box files...")
-    image_files = glob.glob("training_images/*.tif")
-    
-    for image_file in image_files:
-        base_name = os.path.splitext(os.path.basename(image_file))[0]
-        box_command = f'tesseract "{image_file}" "training_images/{base_name}" -l eng --psm 6 batch.nochop makebox'
-        run_command(box_command)
-    
-    # Step 2: Create training files
-    print("Step 2: Creating training files...")
-    for image_file in image_files:
-        base_name = os.path.splitext(os.path.basename(image_file))[0]
-        
-        # Generate .tr file
-        tr_command = f'tesseract "training_images/{base_name}.tif" "training_images/{base_name}" -l eng --psm 6 box.train'
-        run_command(tr_command)
-    
-    # Step 3: Extract character features
-    print("Step 3: Extracting character features...")
-    run_command("unicharset_extractor training_images/*.box")
-    
-    # Step 4: Create font properties file
-    with open("font_properties", "w") as f:
-        f.write("gillsans 0 0 0 0 0\n")
-    
-    # Step 5: Clustering
-    print("Step 5: Clustering...")
-    run_command("mftraining -F font_properties -U unicharset -O gillsans.unicharset training_images/*.tr")
-    run_command("cntraining training_images/*.tr")
-    
-    # Step 6: Rename files
-    print("Step 6: Renaming files...")
-    files_to_rename = [
-        ("inttemp", "gillsans.inttemp"),
-        ("normproto", "gillsans.normproto"),
-        ("pffmtable", "gillsans.pffmtable"),
-        ("shapetable", "gillsans.shapetable")
-    ]
-    
-    for old_name, new_name in files_to_rename:
-        if os.path.exists(old_name):
-            os.rename(old_name, new_name)
-    
-    # Step 7: Combine data files
-    print("Step 7: Combining data files...")
-    run_command("combine_tessdata gillsans.")
-    
-    # Step 8: Move trained data to tessdata directory
-    if os.path.exists("gillsans.traineddata"):
-        os.rename("gillsans.traineddata", "tessdata/gillsans.traineddata")
-        print("Training completed! gillsans.traineddata created in tessdata directory.")
-    else:
-        print("Training failed. gillsans.traineddata not created.")
+
+    trained, digests = prepare_training_images(images_dir, jobs, force, layout)
+    if not trained:
+        print("No images were processed successfully. Stopping.")
+        return False
+
+    return train_from_images(trained, digests, force=force)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train a Tesseract model from the rendered training images")
+    parser.add_argument('--jobs', type=int, default=None, help="Concurrent tesseract processes (default: one per CPU)")
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help=f"Folder with training images (default: {IMAGES_DIR})")
+    parser.add_argument('--force', action='store_true', help="Retrain everything even if inputs are unchanged")
+    parser.add_argument('--layout', choices=["image", "batch"], default="image",
+                        help="Train from single-image TIFFs or per-font multi-page batches (default: image)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Record every step and tesseract run; write a Chrome trace to PATH and print a summary")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    train_tesseract_model()
+    args = parse_args()
+    if args.trace:
+        tracing.enable()
+    try:
+        train_tesseract_model(jobs=args.jobs, images_dir=args.images_dir, force=args.force, layout=args.layout)
+    finally:
+        if args.trace:
+            tracing.finish(args.trace)
@@ -0,0 +1,100 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from train_model import LANG, IMAGES_DIR, font_name_from_image, prepare_training_images, run_command, train_from_images
+
+WORKSPACES_DIR = "variants"
+OUTPUT_DIR = "tessdata/variants"
+DEFAULT_SIZE_SUBSETS = ["16,20", "24,28,32"]
+
+
+def image_size(image_file):
+    """Font size from <lang>.<font>.exp<n>.<size>.tif"""
+    return int(os.path.basename(image_file).split('.')[-2])
+
+
+def build_variants(images, kinds, size_subsets):
+    """Map each variant label to the training images it uses"""
+    variants = {}
+    if "font" in kinds:
+        for font in sorted({font_name_from_image(f) for f in images}):
+            variants[f"font-{font}"] = [f for f in images if font_name_from_image(f) == font]
+    if "size" in kinds:
+        for subset in size_subsets:
+            sizes = {int(s) for s in subset.split(',')}
+            label = "sizes-" + "-".join(str(s) for s in sorted(sizes))
+            variants[label] = [f for f in images if image_size(f) in sizes]
+    if "all" in kinds:
+        variants["all"] = list(images)
+    return {label: files for label, files in variants.items() if files}
+
+
+def train_variant(label, images, digests, force=False):
+    """Train one variant in its own workspace; return the model path or None"""
+    workspace = os.path.join(WORKSPACES_DIR, label)
+    output_path = os.path.join(OUTPUT_DIR, label, f"{LANG}.traineddata")
+    if train_from_images(images, digests, workspace, output_path, force=force, label=label):
+        return output_path
+    return None
+
+
+def train_variants(kinds=("font", "size", "all"), size_subsets=DEFAULT_SIZE_SUBSETS, variant_jobs=None,
+                   jobs=None, images_dir=IMAGES_DIR, force=False):
+    """Train every requested variant concurrently; return {label: model path or None}"""
+    if not run_command(["tesseract", "--version"]):
+        print("Tesseract not found. Please install Tesseract OCR with training tools.")
+        return {}
+
+    # Box/tr files don't depend on the variant, so build them once up front
+    images, digests = prepare_training_images(images_dir, jobs, force)
+    if not images:
+        print("No images were processed successfully. Stopping.")
+        return {}
+
+    variants = build_variants(images, kinds, size_subsets)
+    print(f"\nTraining {len(variants)} variant(s):")
+    for label, files in variants.items():
+        print(f"  - {label}: {len(files)} images")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=variant_jobs or os.cpu_count()) as executor:
+        futures = {
+            executor.submit(train_variant, label, files, digests, force): label
+            for label, files in variants.items()
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    print(f"\n{'='*50}")
+    print("VARIANT SWEEP RESULTS")
+    print(f"{'='*50}")
+    for label in variants:
+        model = results.get(label)
+        print(f"  {'OK' if model else 'FAILED':6} {label}: {model or 'no model'}")
+    print(f"\nUse a variant with: --tessdata-dir \"{OUTPUT_DIR}/<label>\" -l {LANG}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train several model variants concurrently, each in its own workspace")
+    parser.add_argument('--kinds', nargs='+', choices=["font", "size", "all"], default=["font", "size", "all"],
+                        help="Variant kinds: one per font weight, one per size subset, all weights combined")
+    parser.add_argument('--size-subsets', nargs='+', default=DEFAULT_SIZE_SUBSETS,
+                        help=f"Comma-separated size lists for size variants (default: {' '.join(DEFAULT_SIZE_SUBSETS)})")
+    parser.add_argument('--variant-jobs', type=int, default=None, help="Variants trained at once (default: one per CPU)")
+    parser.add_argument('--jobs', type=int, default=None, help="Concurrent tesseract processes for box/tr files")
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help=f"Folder with training images (default: {IMAGES_DIR})")
+    parser.add_argument('--force', action='store_true', help="Retrain every variant even if inputs are unchanged")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    train_variants(
+        kinds=args.kinds,
+        size_subsets=args.size_subsets,
+        variant_jobs=args.variant_jobs,
+        jobs=args.jobs,
+        images_dir=args.images_dir,
+        force=args.force,
+    )
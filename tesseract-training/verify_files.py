@@ -1,63 +1,50 @@
-import os
+from font_inventory import describe_font, scan_folder
 
 def verify_training_files():
     """Verify files are properly placed in training folder"""
     
     training_path = "training"
-    abs_path = os.path.abspath(training_path)
+    scan = scan_folder(training_path)
     
     print(f"=== VERIFYING TRAINING FOLDER ===")
-    print(f"Checking: {abs_path}")
+    print(f"Checking: {scan['path']}")
     
-    if not os.path.exists(training_path):
+    if not scan["exists"]:
         print("❌ Training folder doesn't exist!")
         return False
     
-    try:
-        files = os.listdir(training_path)
-        print(f"Files found: {len(files)}")
-        
-        if not files:
-            print("❌ Training folder is empty!")
-            print("Please copy your Gill Sans OTF files to this folder.")
-            return False
-        
-        otf_files = []
-        other_files = []
-        
-        for file in files:
-            file_path = os.path.join(training_path, file)
-            if os.path.isfile(file_path):
-                if file.lower().endswith('.otf'):
-                    otf_files.append(file)
-                else:
-                    other_files.append(file)
-        
-        print(f"\n=== FILE BREAKDOWN ===")
-        if otf_files:
-            print(f"✅ OTF files found: {len(otf_files)}")
-            for font in otf_files:
-                file_path = os.path.join(training_path, font)
-                size = os.path.getsize(file_path)
-                print(f"  - {font} ({size:,} bytes)")
-        else:
-            print("❌ No OTF files found!")
-        
-        if other_files:
-            print(f"Other files: {len(other_files)}")
-            for file in other_files:
-                print(f"  - {file}")
-        
-        if otf_files:
-            print(f"\n✅ Ready to proceed with training!")
-            print(f"Run: python run_training.py")
-            return True
-        else:
-            print(f"\n❌ No OTF files detected. Please add Gill Sans OTF files.")
-            return False
-            
-    except Exception as e:
-        print(f"Error checking files: {e}")
+    if scan.get("error"):
+        print(f"Error checking files: {scan['error']}")
+        return False
+    
+    otf_files = scan["fonts"]
+    other_files = scan["files"]
+    print(f"Files found: {len(otf_files) + len(other_files) + len(scan['dirs'])}")
+    
+    if not otf_files and not other_files and not scan["dirs"]:
+        print("❌ Training folder is empty!")
+        print("Please copy your Gill Sans OTF files to this folder.")
+        return False
+    
+    print(f"\n=== FILE BREAKDOWN ===")
+    if otf_files:
+        print(f"✅ OTF files found: {len(otf_files)}")
+        for font in otf_files:
+            print(f"  - {font['name']} ({font['size']:,} bytes): {describe_font(font)}")
+    else:
+        print("❌ No OTF files found!")
+    
+    if other_files:
+        print(f"Other files: {len(other_files)}")
+        for name, _ in other_files:
+            print(f"  - {name}")
+    
+    if otf_files:
+        print(f"\n✅ Ready to proceed with training!")
+        print(f"Run: python run_training.py")
+        return True
+    else:
+        print(f"\n❌ No OTF files detected. Please add Gill Sans OTF files.")
         return False
 
 if __name__ == "__main__":
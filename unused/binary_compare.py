@@ -1,25 +1,176 @@
-def binary_to_text(binary_str):
-    chars = []
-    for b in binary_str.split():
-        try:
-            chars.append(chr(int(b, 2)))
-        except:
-            chars.append('?')
-    return ''.join(chars)
+import os
+import sys
+import codecs
+import json
+import argparse
+import numpy as np
+from text_score import CHAR_CLASSES, score_text
+
+# Bytes read per step when streaming a dump; decoding uses a few times this in scratch memory
+CHUNK_SIZE = 1 << 22
+
+_WHITESPACE = b" \t\n\r\v\f"
+_UNKNOWN = ord('?')
+
+
+def _is_space(a):
+    # space, or \t \n \v \f \r (9-13); uint8 subtraction wraps everything below 9
+    return (a == 32) | ((a - np.uint8(9)) < 5)
+
+
+def _is_bit(a):
+    # '0' | 1 == '1' | 1 == '1', and no other byte maps there
+    return (a | 1) == ord('1')
+
+
+def _last_space(data):
+    return max(data.rfind(c) for c in _WHITESPACE)
+
+
+def _first_space(data):
+    found = [i for i in (data.find(c) for c in _WHITESPACE) if i >= 0]
+    return min(found) if found else -1
+
+
+def decode_groups(data):
+    """Decode whitespace-separated groups of 0/1 characters to one byte per group
+
+    Groups of up to 8 bits become the byte they spell, e.g. 1000001 -> 'A';
+    longer groups or groups with other characters become '?'.
+    """
+    a = np.frombuffer(data, dtype=np.uint8)
+    if a.size == 0:
+        return b''
+
+    # Token boundaries: runs of non-whitespace bytes
+    in_token = ~_is_space(a)
+    edges = np.diff(in_token.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    if np.all(ends - starts == 8):
+        # Fast path for well-formed dumps: pack the group characters back to back
+        chars = a[in_token]
+        values = np.packbits((chars & 1).view(bool))
+        valid = _is_bit(chars).reshape(-1, 8).all(axis=1)
+        return np.where(valid, values, np.uint8(_UNKNOWN)).tobytes()
+
+    # Right-align each group in an 8-bit window; positions before the group are padding
+    idx = ends[:, None] - 8 + np.arange(8)
+    inside = idx >= starts[:, None]
+    window = a[np.maximum(idx, 0)]
+    valid = (ends - starts <= 8) & np.all(_is_bit(window) | ~inside, axis=1)
+
+    # '0' and '1' differ only in their lowest bit
+    values = np.packbits((window & 1).astype(bool) & inside, axis=1)[:, 0]
+    out = np.where(valid, values, np.uint8(_UNKNOWN))
+    return out.tobytes()
+
+
+def iter_decoded_bytes(path, chunk_size=CHUNK_SIZE):
+    """Stream a binary dump from disk, yielding decoded bytes in constant memory"""
+    with open(path, 'rb') as f:
+        carry = b''
+        skipping = False  # inside a group too long to hold; it decodes to '?'
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data = carry + chunk
+            last = _last_space(data)
+            if last < 0:
+                # No group boundary in this chunk at all
+                if not skipping and len(data) > 8:
+                    skipping = True
+                    yield bytes([_UNKNOWN])
+                carry = b'' if skipping else data
+                continue
+            head = data[:last + 1]
+            if skipping:
+                head = head[_first_space(head):]
+                skipping = False
+            yield decode_groups(head)
+            carry = data[last + 1:]
+        if carry and not skipping:
+            yield decode_groups(carry)
+
+
+def iter_decoded_text(path, encoding='latin-1', chunk_size=CHUNK_SIZE):
+    """Stream a binary dump as text; multi-byte UTF-8 characters may span chunks"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for block in iter_decoded_bytes(path, chunk_size):
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def binary_to_text(binary_str, encoding='latin-1'):
+    data = binary_str.encode('utf-8') if isinstance(binary_str, str) else binary_str
+    return decode_groups(data).decode(encoding, errors='replace')
+
 
 def read_file(path):
     with open(path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def compare_text(decoded, reference):
-    import difflib
-    diff = difflib.unified_diff(reference.splitlines(), decoded.splitlines(), lineterm='')
-    return '\n'.join(diff)
+
+def compare_text(decoded, reference, max_hunks=50):
+    """Score decoded text against the reference; return the report and the score dict"""
+    score = score_text(reference, decoded, max_hunks=max_hunks)
+    lines = [
+        f"CER: {score['cer']:.4%} ({score['char_errors']} errors in {score['reference_chars']} characters: "
+        f"{score['substitutions']} substituted, {score['insertions']} inserted, {score['deletions']} deleted)",
+        f"WER: {score['wer']:.4%} ({score['word_errors']} errors in {score['reference_words']} words)",
+    ]
+    for cls in CHAR_CLASSES:
+        counts = score['by_class'][cls]
+        errors = counts['substitutions'] + counts['insertions'] + counts['deletions']
+        if counts['reference'] or errors:
+            lines.append(f"  {cls:7} {errors:6} errors / {counts['reference']} characters")
+    if score['approximate']:
+        lines.append("Some regions differed too much to align exactly; their counts are upper bounds")
+    for hunk in score['hunks']:
+        lines.append(f"@ {hunk['ref_offset']}: {hunk['reference']!r} -> {hunk['hypothesis']!r}")
+    return '\n'.join(lines), score
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Decode a binary dump and compare it with the reference text")
+    parser.add_argument('binary', nargs='?', default="binary-output.txt", help="Whitespace-separated bit groups")
+    parser.add_argument('reference', nargs='?', default="will text.txt", help="Expected plain text")
+    parser.add_argument('--encoding', default='latin-1', help="Encoding of the decoded bytes, e.g. utf-8 (default: latin-1)")
+    parser.add_argument('--realign', action='store_true',
+                        help="Input is raw or partly spaced OCR output; recover byte alignment instead of trusting spaces")
+    parser.add_argument('--decode-only', action='store_true', help="Stream the decoded text to stdout and skip the comparison")
+    parser.add_argument('--json', action='store_true', help="Print the comparison scores as JSON instead of a report")
+    parser.add_argument('--max-hunks', type=int, default=50, help="Differing regions to list (default: 50)")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    binary_data = read_file("binary-output.txt")
-    will_text = read_file("will text.txt")
-    decoded_text = binary_to_text(binary_data)
+    args = parse_args()
+    if args.realign:
+        # The OCR decoder lives with the OCR tools in ../tesseract-training
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tesseract-training"))
+        from ocr_decode import decode_ocr_text
+        decoded = [decode_ocr_text(read_file(args.binary), args.encoding)]
+    else:
+        decoded = iter_decoded_text(args.binary, args.encoding)
+
+    if args.decode_only:
+        for text in decoded:
+            sys.stdout.write(text)
+        sys.exit(0)
+
+    will_text = read_file(args.reference)
+    decoded_text = ''.join(decoded)
+    report, score = compare_text(decoded_text, will_text, args.max_hunks)
+    if args.json:
+        print(json.dumps(score, indent=1))
+        sys.exit(0)
     print("Decoded Text:\n", decoded_text)
     print("\nComparison to Will Document:\n")
-    print(compare_text(decoded_text, will_text))
+    print(report)